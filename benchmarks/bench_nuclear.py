@@ -0,0 +1,191 @@
+"""Benchmarks for `common.nuclear` and the construction of the physics scenes
+
+Runs offline, writes the timings to a JSON file and compares them against a stored baseline:
+
+    python benchmarks/bench_nuclear.py --save-baseline    # on the commit to compare against
+    python benchmarks/bench_nuclear.py                    # after a change
+"""
+import argparse
+import glob
+import importlib.util
+import inspect
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+SCENE_DIR = os.path.join(ROOT_DIR, "physics")
+sys.path.insert(0, ROOT_DIR)
+
+import numpy as np
+
+from common import nuclear
+
+NUCLEUS_SIZES = [4, 16, 64, 256, 1024, 5000]
+NUCLEON_SEPARATION = 0.6
+PARTICLE_NUM_DIFFERENCE = 4
+SIZE_MULTIPLIER = 0.4
+DEFAULT_RESULTS = os.path.join(BENCH_DIR, "results.json")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+def _time(func, setup=None, min_time=0.2, repeats=5):
+    """Returns the median time of a call to `func`, calling `setup` (untimed) before every call"""
+    times = []
+    deadline = time.perf_counter() + min_time
+    while len(times) < repeats or time.perf_counter() < deadline:
+        arg = setup() if setup is not None else None
+        start = time.perf_counter()
+        func(arg)
+        times.append(time.perf_counter() - start)
+        if len(times) >= 1000:
+            break
+    return statistics.median(times)
+
+def _make_nucleus(size):
+    return nuclear.Nucleus().init_from_nums(size // 2, size - size // 2, NUCLEON_SEPARATION, PARTICLE_NUM_DIFFERENCE, SIZE_MULTIPLIER, seed=1)
+
+def _clear_layout_cache():
+    """Clears the layout cache, on the commits that have one, so that the next layout is computed from scratch"""
+    for func in (nuclear.Nucleus._generate_full_nucleus_pattern, getattr(nuclear, "layout_nucleus", None)):
+        if hasattr(func, "cache_clear"):
+            func.cache_clear()
+
+def bench_nucleus(size):
+    """Times every operation on a nucleus of `size` nucleons
+    Only uses the API that the nucleus has always had, so that a baseline can be recorded on any commit
+    """
+    import manim as _m
+
+    results = {}
+    layout = lambda _: nuclear.Nucleus._generate_full_nucleus_pattern(size, NUCLEON_SEPARATION, PARTICLE_NUM_DIFFERENCE)
+    results["layout_cold"] = _time(layout, setup=_clear_layout_cache)
+    results["layout_cached"] = _time(layout)
+    results["init_from_nums"] = _time(lambda _: _make_nucleus(size))
+
+    nucleus = _make_nucleus(size)
+    nucleons = nucleus.get_nucleons_list()
+    results["init_from_nucleons"] = _time(
+        lambda _: nuclear.Nucleus().init_from_nucleons(nucleons, NUCLEON_SEPARATION, PARTICLE_NUM_DIFFERENCE, SIZE_MULTIPLIER, True))
+    results["decay"] = _time(lambda _: nucleus.decay(2, 2, (2, -1), False, False))
+    results["get_nucleons_list"] = _time(lambda _: nucleus.get_nucleons_list())
+    results["create_anims"] = _time(lambda _: list(nucleus.create_anims(_m.DrawBorderThenFill)))
+
+    rng = np.random.default_rng(0)
+    radius = max(np.abs(n.get_center()[:2]).max() for n in nucleons) + NUCLEON_SEPARATION
+    queries = [tuple(q) for q in rng.uniform(-radius, radius, (100, 2)).tolist()]
+    # Anything that is built on the first query is left out of the timing
+    nucleus.find_closest_nucleon((0, 0), nuclear.PROTON)
+    results["find_closest_nucleon"] = _time(lambda _: nucleus.find_closest_nucleon(queries[0], nuclear.PROTON))
+    results["find_closest_nucleon_100"] = _time(lambda _: [nucleus.find_closest_nucleon(q, nuclear.PROTON) for q in queries])
+    return results
+
+def _load_module(path):
+    """Imports a topic module from its path, as their names are not valid module names"""
+    name = "physics_" + os.path.splitext(os.path.basename(path))[0].replace(".", "_")
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def _discover_scenes():
+    """Returns (module path, scene name) for every Scene subclass defined in the topic modules"""
+    from manim import Scene
+
+    scenes = []
+    for path in sorted(glob.glob(os.path.join(SCENE_DIR, "*.py"))):
+        module = _load_module(path)
+        for name, obj in inspect.getmembers(module, inspect.isclass):
+            if issubclass(obj, Scene) and obj.__module__ == module.__name__:
+                scenes.append((path, name))
+    return scenes
+
+def _skip_frames(scene):
+    """Same as `common.profiling.skip_frames`, which older commits do not have
+    A skipping scene still draws its static mobjects and the last frame of every call, unless told to honour skipping
+    """
+    update_frame = scene.renderer.update_frame
+    scene.renderer.update_frame = lambda *args, **kwargs: update_frame(*args, **{**kwargs, "ignore_skipping": False})
+
+def bench_scenes():
+    """Times constructing every scene in `physics/` without rendering any frames
+    The LaTeX is compiled before the timing, where the LaTeX cache exists
+    """
+    from manim import tempconfig
+
+    scenes = _discover_scenes()
+    try:
+        from common import tex_cache
+    except ImportError:
+        pass
+    else:
+        tex_cache.precompile()
+
+    results = {}
+    for module_path, scene_name in scenes:
+        # Load the module again for every run, as the scenes change module level ValueTrackers
+        setup = lambda: getattr(_load_module(module_path), scene_name)
+        def construct(scene_class):
+            # Skipping the animations is what stops the frames from being drawn, `dry_run` only stops the video from being written
+            with tempconfig({"dry_run": True}):
+                scene = scene_class(skip_animations=True)
+                _skip_frames(scene)
+                scene.render()
+        results[scene_name] = _time(construct, setup, min_time=0, repeats=3)
+    return results
+
+def run():
+    results = {}
+    for size in NUCLEUS_SIZES:
+        for name, seconds in bench_nucleus(size).items():
+            results[f"nucleus/{name}/{size}"] = seconds
+    for name, seconds in bench_scenes().items():
+        results[f"scene_construct/{name}"] = seconds
+    return results
+
+def compare(results, baseline, threshold):
+    """Prints every timing next to the baseline, and returns the names of the ones that got slower by more than `threshold`"""
+    regressions = []
+    print(f"{'benchmark':60} {'time':>12} {'baseline':>12} {'ratio':>7}")
+    for name, seconds in results.items():
+        if name not in baseline:
+            print(f"{name:60} {seconds * 1e3:10.3f}ms {'-':>12} {'-':>7}")
+            continue
+        ratio = seconds / baseline[name]
+        flag = ""
+        if ratio > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:60} {seconds * 1e3:10.3f}ms {baseline[name] * 1e3:10.3f}ms {ratio:6.2f}x{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default=DEFAULT_RESULTS, help="where to write the timings")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="timings to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store the timings as the new baseline")
+    parser.add_argument("--threshold", type=float, default=1.2, help="ratio to the baseline that counts as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit with an error if anything regressed")
+    args = parser.parse_args()
+
+    results = run()
+    output = {"python": platform.python_version(), "machine": platform.machine(), "seconds": results}
+    with open(args.output, "w") as f:
+        json.dump(output, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(output, f, indent=2)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["seconds"]
+    regressions = compare(results, baseline, args.threshold)
+    if regressions and args.fail_on_regression:
+        sys.exit(f"{len(regressions)} benchmarks regressed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Vectorised forces between nucleons
+
+Coordinates are (N, 2) arrays in fm. A positive force magnitude pushes two nucleons apart, just like on the
+graphs of CompareForcesScene, where the strong force is repulsive at very short distances and attractive further out.
+The strong force only acts within a cutoff, so it is computed from a neighbour list. The Coulomb force is exact for
+small nuclei, and uses the total charge of far away cells (a one level Barnes-Hut approximation) for large ones.
+"""
+import numpy as np
+
+# The shape of the strong force on the graph of CompareForcesScene
+STRONG_FORCE_A = 2
+STRONG_FORCE_B = -0.95
+STRONG_FORCE_C = -5
+# The strong force is negligible further than this many fm
+STRONG_FORCE_RANGE = 3
+
+# Up to how many charged particles the Coulomb force is computed exactly
+COULOMB_EXACT_LIMIT = 2048
+# How many particles to aim for in each cell when approximating the Coulomb force
+_COULOMB_PARTICLES_PER_CELL = 16
+# How many targets to compare against all sources at once
+_CHUNK_SIZE = 1024
+
+def strong_force_magnitude(distances, a=STRONG_FORCE_A, b=STRONG_FORCE_B, c=STRONG_FORCE_C):
+    # Do some shifting and scaling to the input
+    x = a * distances + b
+    return c * x / np.exp(x)
+
+def _neighbour_cell_pairs(coords, cell_size):
+    """Returns every pair (i, j), i < j, of points that are in the same or in adjacent cells of a grid"""
+    n = len(coords)
+    if n < 2:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    cells = np.floor(coords / cell_size).astype(np.int64)
+    cells -= cells.min(axis=0)
+    # Leave a column of empty cells on each side, so that looking at a neighbouring cell never wraps around to another row
+    width = cells[:, 1].max() + 3
+    cell_ids = (cells[:, 0] + 1) * width + (cells[:, 1] + 1)
+    order = np.argsort(cell_ids, kind="stable")
+    sorted_ids = cell_ids[order]
+
+    all_i = []
+    all_j = []
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            neighbour_ids = cell_ids + dx * width + dy
+            starts = np.searchsorted(sorted_ids, neighbour_ids, side="left")
+            counts = np.searchsorted(sorted_ids, neighbour_ids, side="right") - starts
+            i = np.repeat(np.arange(n), counts)
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            j = order[np.repeat(starts, counts) + offsets]
+            keep = i < j
+            all_i.append(i[keep])
+            all_j.append(j[keep])
+    return np.concatenate(all_i), np.concatenate(all_j)
+
+def pairs_within(coords, cutoff):
+    """Returns every pair (i, j), i < j, of points closer than `cutoff` to each other, without comparing all pairs"""
+    coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+    i, j = _neighbour_cell_pairs(coords, cutoff)
+    keep = ((coords[i] - coords[j]) ** 2).sum(axis=1) < cutoff ** 2
+    return i[keep], j[keep]
+
+def _accumulate_pair_forces(n, i, j, pair_forces):
+    """Adds the force of each pair to i, and its opposite to j"""
+    forces = np.zeros((n, 2))
+    for axis in range(2):
+        forces[:, axis] = np.bincount(i, pair_forces[:, axis], n) - np.bincount(j, pair_forces[:, axis], n)
+    return forces
+
+def strong_forces(coords, cutoff=STRONG_FORCE_RANGE, a=STRONG_FORCE_A, b=STRONG_FORCE_B, c=STRONG_FORCE_C):
+    """Returns the net strong force on every nucleon as an (N, 2) array"""
+    coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+    i, j = pairs_within(coords, cutoff)
+    deltas = coords[i] - coords[j]
+    distances = np.linalg.norm(deltas, axis=1)
+    # Nucleons on top of each other do not push each other in any direction
+    directions = np.divide(deltas, distances[:, None], out=np.zeros_like(deltas), where=distances[:, None] > 0)
+    return _accumulate_pair_forces(len(coords), i, j, directions * strong_force_magnitude(distances, a, b, c)[:, None])
+
+def _coulomb_from_sources(targets, target_charges, sources, source_charges, strength, mask=None):
+    """Sums the Coulomb forces of all the sources on each of the targets, leaving out the pairs where `mask(chunk)` is False"""
+    forces = np.zeros((len(targets), 2))
+    for start in range(0, len(targets), _CHUNK_SIZE):
+        chunk = slice(start, start + _CHUNK_SIZE)
+        deltas = targets[chunk, None, :] - sources[None, :, :]
+        sq_distances = (deltas ** 2).sum(axis=2)
+        # Leave out each particle's force on itself
+        weights = np.divide(source_charges, sq_distances ** 1.5, out=np.zeros_like(sq_distances), where=sq_distances > 0)
+        if mask is not None:
+            weights *= mask(chunk)
+        forces[chunk] = strength * target_charges[chunk, None] * (weights[:, :, None] * deltas).sum(axis=1)
+    return forces
+
+def coulomb_forces(coords, charges, strength=1.0, exact_limit=COULOMB_EXACT_LIMIT):
+    """Returns the net Coulomb force on every particle as an (N, 2) array
+    Above `exact_limit` charged particles, the particles in each cell only feel the exact forces from their own and the
+    neighbouring cells, and the total charge of every other cell at its centre of charge
+    """
+    coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+    charges = np.asarray(charges, dtype=float)
+    forces = np.zeros((len(coords), 2))
+    # Only charged particles feel or cause Coulomb forces
+    charged = np.flatnonzero(charges != 0)
+    points = coords[charged]
+    q = charges[charged]
+    if len(charged) <= exact_limit:
+        forces[charged] = _coulomb_from_sources(points, q, points, q, strength)
+        return forces
+
+    extent = np.ptp(points, axis=0).max()
+    cell_size = extent / max(np.sqrt(len(points) / _COULOMB_PARTICLES_PER_CELL), 1)
+    cells = np.floor(points / cell_size).astype(np.int64)
+
+    # Near field: exact forces between particles in the same or adjacent cells
+    i, j = _neighbour_cell_pairs(points, cell_size)
+    deltas = points[i] - points[j]
+    sq_distances = (deltas ** 2).sum(axis=1)
+    weights = np.divide(q[i] * q[j], sq_distances ** 1.5, out=np.zeros_like(sq_distances), where=sq_distances > 0)
+    near = _accumulate_pair_forces(len(points), i, j, strength * weights[:, None] * deltas)
+
+    # Far field: every other cell acts as a single charge
+    cell_keys, cell_of = np.unique(cells, axis=0, return_inverse=True)
+    cell_of = cell_of.reshape(-1)
+    cell_charges = np.bincount(cell_of, q, len(cell_keys))
+    cell_abs_charges = np.bincount(cell_of, np.abs(q), len(cell_keys))
+    # Weigh by the absolute charge, so that cells with a total charge of 0 still get a sensible centre
+    cell_centers = np.column_stack([np.bincount(cell_of, np.abs(q) * points[:, axis], len(cell_keys)) for axis in range(2)]) / cell_abs_charges[:, None]
+    far_cells = lambda chunk: np.abs(cells[chunk, None, :] - cell_keys[None, :, :]).max(axis=2) > 1
+    far = _coulomb_from_sources(points, q, cell_centers, cell_charges, strength, far_cells)
+
+    forces[charged] = near + far
+    return forces
+
+def radial_binding(coords, forces):
+    """How strongly each particle is pulled towards the centre of the nucleus by the given forces
+    Positive values mean that the particle is held in, and negative ones that it is being pushed out
+    """
+    coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+    inwards = coords.mean(axis=0) - coords
+    distances = np.linalg.norm(inwards, axis=1)
+    inwards = np.divide(inwards, distances[:, None], out=np.zeros_like(inwards), where=distances[:, None] > 0)
+    return (forces * inwards).sum(axis=1)
@@ -0,0 +1,70 @@
+"""Graphs that are cheap to keep up to date while the values they depend on are being animated"""
+import manim as _m
+import numpy as np
+
+class SampledFunction:
+    """Samples a vectorised function on a fixed grid of x values of some axes
+    The points are kept in one buffer that is only recomputed when one of the `trackers` (the ValueTrackers the function reads)
+    changes, or when the axes move
+    """
+    def __init__(self, axes, function, x_range, trackers=()):
+        x_min, x_max, x_step = x_range
+        self.axes = axes
+        self.function = function
+        self.trackers = list(trackers)
+        self.x_values = np.arange(x_min, x_max + x_step / 2, x_step)
+        self.points = np.zeros((len(self.x_values), 3))
+        # Increases every time the points change, so that curves know when to redraw
+        self.version = 0
+        self._inputs = None
+
+    def _get_inputs(self):
+        # Two points are enough to tell if the axes have been moved or scaled
+        placement = np.concatenate([self.axes.coords_to_point(0, 0), self.axes.coords_to_point(1, 1)])
+        return tuple(t.get_value() for t in self.trackers) + tuple(placement)
+
+    def refresh(self):
+        """Recomputes the points if any of the inputs have changed"""
+        inputs = self._get_inputs()
+        if inputs != self._inputs:
+            self._inputs = inputs
+            y_values = self.function(self.x_values)
+            self.points[:] = self.axes.coords_to_point(self.x_values, y_values).T
+            self.version += 1
+        return self
+
+    def _index_of(self, x):
+        return int(np.argmin(np.abs(self.x_values - x)))
+
+    def input_to_point(self, x):
+        """The point on the graph at `x`, interpolated from the samples"""
+        self.refresh()
+        return np.array([np.interp(x, self.x_values, self.points[:, i]) for i in range(3)])
+
+    def get_curve(self, x_min=None, x_max=None, **kwargs):
+        """Makes a curve through the samples between `x_min` and `x_max` (the whole range by default)"""
+        if x_min is None:
+            x_min = self.x_values[0]
+        if x_max is None:
+            x_max = self.x_values[-1]
+        return SampledCurve(self, x_min, x_max, **kwargs)
+
+class SampledCurve(_m.VMobject):
+    """A part of the graph of a `SampledFunction`, which is only redrawn when the samples change
+    The points of the curve are read from a slice of the shared buffer of the samples
+    """
+    def __init__(self, samples, x_min, x_max, **kwargs):
+        super().__init__(**kwargs)
+        self.samples = samples
+        self.start = samples._index_of(x_min)
+        self.end = samples._index_of(x_max) + 1
+        self._drawn_version = None
+        self.redraw()
+        self.add_updater(lambda curve: curve.redraw())
+
+    def redraw(self):
+        self.samples.refresh()
+        if self.samples.version != self._drawn_version:
+            self._drawn_version = self.samples.version
+            self.set_points_smoothly(self.samples.points[self.start:self.end])
+        return self
@@ -0,0 +1,31 @@
+"""Nuclei and particles
+
+The data model in `core` and the file format in `store` are imported straight away and do not need manim. The mobjects
+(`Nucleus`, `Particle` and the rest) live in `mobjects`, which imports manim, so it is only loaded the first time one
+of them is used.
+"""
+import importlib
+
+from common.nuclear import core, store
+from common.nuclear.core import (
+    PROTON, NEUTRON, ELECTRON, POSITRON, NEUTRINO, GAMMA, PARTICLE_TYPES, LAYOUT_CACHE_SIZE,
+    is_nucleon, get_charge, get_drawn_size, get_charges, get_drawn_sizes,
+    layout_nucleus, layout_nucleus_3d, layout, NucleonGrid, NucleonIndex, select_closest, partition_for_decay,
+    ASSIGNMENT_EXACT_LIMIT, assign_min_cost, assign_by_type, plan_decay, get_forces, get_binding,
+    ALPHA, BETA_MINUS, BETA_PLUS, GAMMA_DECAY, DECAY_MODES, URANIUM_238_SERIES, DecayStep, plan_decay_chain,
+)
+
+# The names that are looked up in `mobjects`. Anything else is an AttributeError straight away, so that tools that look
+# for optional attributes, like pickle and inspect, and typos do not pull in manim
+_MOBJECT_NAMES = frozenset({
+    "Particle", "ParticleLabel", "LabelTracker", "Nucleus", "NucleusTransition", "ParticleSystem", "ForceArrows",
+    "install_fingerprint_hashing",
+})
+
+def __getattr__(name):
+    if name != "mobjects" and name not in _MOBJECT_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    mobjects = importlib.import_module("common.nuclear.mobjects")
+    if name == "mobjects":
+        return mobjects
+    return getattr(mobjects, name)
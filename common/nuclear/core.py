@@ -0,0 +1,521 @@
+"""The data model of nuclei: particle types, charges, layouts, decay selection, nearest nucleon queries and forces
+
+Only depends on NumPy (and `common.forces`, which does too), so that tools which only need layouts or decay partitions, like pre-computation workers and
+benchmarks, do not have to import manim. The mobjects in `common.nuclear.mobjects` are drawn from these.
+"""
+import numpy as np
+import math
+import functools
+import collections
+
+from common import forces
+
+# The different particles
+PROTON = 0
+NEUTRON = 1
+ELECTRON = 2
+POSITRON = 3
+NEUTRINO = 4
+GAMMA = 5
+PARTICLE_TYPES = [PROTON, NEUTRON, ELECTRON, POSITRON, NEUTRINO, GAMMA]
+
+# The modes of decay in a decay chain
+ALPHA = "alpha"
+BETA_MINUS = "beta-"
+BETA_PLUS = "beta+"
+GAMMA_DECAY = "gamma"
+DECAY_MODES = [ALPHA, BETA_MINUS, BETA_PLUS, GAMMA_DECAY]
+# From uranium-238 to lead-206
+URANIUM_238_SERIES = [ALPHA, BETA_MINUS, BETA_MINUS, ALPHA, ALPHA, ALPHA, ALPHA, ALPHA, BETA_MINUS, BETA_MINUS, ALPHA, BETA_MINUS, BETA_MINUS, ALPHA]
+
+def is_nucleon(type):
+    return type in [PROTON, NEUTRON]
+
+def get_charge(type):
+    if type in [PROTON, POSITRON]:
+        return 1
+    elif type in [ELECTRON]:
+        return -1
+    else:
+        return 0
+
+def get_drawn_size(type):
+    """The radius of a particle relative to the size multiplier"""
+    if is_nucleon(type):
+        return 1
+    else:
+        return 0.5
+
+def get_charges(types):
+    """Vectorised version of `get_charge` for an array of types"""
+    return np.isin(types, [PROTON, POSITRON]).astype(np.int64) - (np.asarray(types) == ELECTRON)
+
+def get_drawn_sizes(types):
+    """Vectorised version of `get_drawn_size` for an array of types"""
+    return np.where(np.isin(types, [PROTON, NEUTRON]), 1, 0.5)
+
+# How many distinct nucleus layouts to remember
+LAYOUT_CACHE_SIZE = 256
+
+def _get_layer_sizes(number_of_particles, particle_num_difference):
+    """Find how many particles go into each concentric layer, innermost first
+    Layer k holds 1 + k * particle_num_difference particles, and the last layer holds the remainder
+    """
+    if number_of_particles <= 1:
+        return np.array([number_of_particles], dtype=np.int64)
+    if particle_num_difference <= 0:
+        return np.ones(number_of_particles, dtype=np.int64)
+    # The first k layers hold k + d * k * (k - 1) / 2 particles, so solve the quadratic for the smallest k that fits all of them
+    d = particle_num_difference
+    b = 1 - d / 2
+    num_layers = math.ceil((-b + math.sqrt(b * b + 2 * d * number_of_particles)) / d)
+    # Guard against floating point errors in the square root
+    capacity = lambda k: k + d * k * (k - 1) // 2
+    while capacity(num_layers) < number_of_particles:
+        num_layers += 1
+    while num_layers > 1 and capacity(num_layers - 1) >= number_of_particles:
+        num_layers -= 1
+
+    layer_sizes = 1 + d * np.arange(num_layers, dtype=np.int64)
+    layer_sizes[-1] = number_of_particles - capacity(num_layers - 1)
+    return layer_sizes
+
+@functools.lru_cache(maxsize=LAYOUT_CACHE_SIZE)
+def layout_nucleus(number_of_particles, nucleon_separation, particle_num_difference):
+    """Vectorised, memoised version of the concentric circle layout
+    Returns a read-only (N, 2) array of positions and an array of layer offsets into it, outermost layer first
+    """
+    # Reverse the layer order to allow the central atoms to cover other atoms if no shuffling has been enabled
+    # This happens because central atoms are added last
+    layer_sizes = _get_layer_sizes(number_of_particles, particle_num_difference)[::-1]
+    layer_offsets = np.zeros(len(layer_sizes) + 1, dtype=np.int64)
+    np.cumsum(layer_sizes, out=layer_offsets[1:])
+
+    # Pick the radius in such a way that the nucleon_separation is the distance between two consequtive nucleons
+    # Arc length is nucleon_separation, and arc length = radius * angle
+    # Each small angle is 2pi/particle_num
+    radii = nucleon_separation / (2*np.pi) * layer_sizes
+    # Place the central nucleon in the center
+    radii[layer_sizes == 1] = 0
+
+    sizes = np.repeat(layer_sizes, layer_sizes)
+    index_in_layer = np.arange(number_of_particles) - np.repeat(layer_offsets[:-1], layer_sizes)
+    angles = 2*np.pi * index_in_layer / np.maximum(sizes, 1)
+    r = np.repeat(radii, layer_sizes)
+
+    positions = np.empty((number_of_particles, 2))
+    positions[:, 0] = r * np.cos(angles)
+    positions[:, 1] = r * np.sin(angles)
+
+    # The result is shared between callers through the cache, so do not let anyone modify it
+    positions.flags.writeable = False
+    layer_offsets.flags.writeable = False
+    return positions, layer_offsets
+
+def _get_shell_sizes(number_of_particles):
+    """Find how many particles go onto each spherical shell, innermost first
+    Shell k has a radius of k separations, so it fits about 4 pi k^2 particles, and the last shell holds the remainder
+    """
+    shell_sizes = [min(number_of_particles, 1)]
+    while sum(shell_sizes) < number_of_particles:
+        k = len(shell_sizes)
+        shell_sizes.append(min(round(4 * np.pi * k * k), number_of_particles - sum(shell_sizes)))
+    return np.array(shell_sizes, dtype=np.int64)
+
+@functools.lru_cache(maxsize=LAYOUT_CACHE_SIZE)
+def layout_nucleus_3d(number_of_particles, nucleon_separation):
+    """Vectorised, memoised 3D layout, which spreads the particles over concentric Fibonacci spheres
+    Returns a read-only (N, 3) array of positions and an array of shell offsets into it, outermost shell first
+    """
+    # Outermost shell first, like `layout_nucleus`
+    shell_sizes = _get_shell_sizes(number_of_particles)[::-1]
+    shell_offsets = np.zeros(len(shell_sizes) + 1, dtype=np.int64)
+    np.cumsum(shell_sizes, out=shell_offsets[1:])
+    radii = nucleon_separation * np.arange(len(shell_sizes))[::-1]
+
+    sizes = np.repeat(shell_sizes, shell_sizes)
+    # Place each point at the middle of an equal area band of its sphere, turning by the golden angle every time
+    index_in_shell = np.arange(number_of_particles) - np.repeat(shell_offsets[:-1], shell_sizes) + 0.5
+    z = 1 - 2 * index_in_shell / sizes
+    ring_radii = np.sqrt(1 - z * z)
+    angles = np.pi * (3 - np.sqrt(5)) * index_in_shell
+    r = np.repeat(radii, shell_sizes)
+
+    positions = np.empty((number_of_particles, 3))
+    positions[:, 0] = r * ring_radii * np.cos(angles)
+    positions[:, 1] = r * ring_radii * np.sin(angles)
+    positions[:, 2] = r * z
+
+    positions.flags.writeable = False
+    shell_offsets.flags.writeable = False
+    return positions, shell_offsets
+
+def layout(number_of_particles, nucleon_separation, particle_num_difference, three_d=False):
+    """Lays a nucleus out with `layout_nucleus_3d` if `three_d` is set, and with `layout_nucleus` otherwise"""
+    if three_d:
+        return layout_nucleus_3d(number_of_particles, nucleon_separation)
+    return layout_nucleus(number_of_particles, nucleon_separation, particle_num_difference)
+
+def _as_query_points(points, dimensions):
+    """Turns query points into an (M, D) array. Points with fewer dimensions, like 2D points for a 3D nucleus, are taken to have 0 for the rest"""
+    points = np.asarray(points, dtype=float)
+    points = points.reshape(-1, points.shape[-1] if points.ndim > 0 else 1)
+    if points.shape[1] < dimensions:
+        points = np.pad(points, ((0, 0), (0, dimensions - points.shape[1])))
+    return points
+
+class NucleonGrid:
+    """A uniform grid over nucleon coordinates, used to answer nearest neighbour queries without scanning every nucleon
+    Each cell is `cell_size` wide, so with the nucleon separation as the cell size every cell only holds a few nucleons
+    Works with coordinates of any dimension, i.e. both 2D and 3D nuclei
+    """
+    # How many query points to compare against all nucleons at once when falling back to brute force
+    _BRUTE_FORCE_CHUNK = 1024
+
+    def __init__(self, coords, indices, cell_size):
+        # `indices` are the indices of the nucleons in the nucleus, and must be sorted
+        coords = np.asarray(coords, dtype=float)
+        self.dimensions = coords.shape[-1] if coords.ndim == 2 else 2
+        self.coords = coords.reshape(-1, self.dimensions)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.cell_size = cell_size if cell_size > 0 else 1
+
+        cells = np.floor(self.coords / self.cell_size).astype(np.int64)
+        self.origin = cells.min(axis=0) if len(cells) else np.zeros(self.dimensions, dtype=np.int64)
+        cells -= self.origin
+        self.shape = cells.max(axis=0) + 1 if len(cells) else np.ones(self.dimensions, dtype=np.int64)
+        num_cells = int(np.prod(self.shape))
+        # How far apart consecutive cells along each axis are in the flattened table
+        self.strides = np.append(np.cumprod(self.shape[:0:-1])[::-1], 1)
+
+        # Store the points of each cell in a row of a padded table, with -1 marking empty slots
+        cell_ids = cells @ self.strides
+        order = np.argsort(cell_ids, kind="stable")
+        counts = np.bincount(cell_ids, minlength=num_cells)
+        sorted_ids = cell_ids[order]
+        slots = np.arange(len(order)) - (np.cumsum(counts) - counts)[sorted_ids]
+        self.table = np.full((num_cells, max(int(counts.max(initial=0)), 1)), -1, dtype=np.int64)
+        self.table[sorted_ids, slots] = order
+
+    def __len__(self):
+        return len(self.coords)
+
+    def _nearest_of_candidates(self, points, candidates, k):
+        """Picks the `k` closest of the candidate points (-1 means no candidate), breaking ties by lower index"""
+        sq_distances = ((self.coords[candidates] - points[:, None, :]) ** 2).sum(axis=2)
+        sq_distances[candidates < 0] = np.inf
+        tie_breaker = np.where(candidates < 0, len(self.coords), candidates)
+        order = np.lexsort((tie_breaker, sq_distances), axis=-1)[:, :k]
+        return np.take_along_axis(sq_distances, order, axis=1), np.take_along_axis(candidates, order, axis=1)
+
+    def _brute_force(self, points, k):
+        sq_distances = np.empty((len(points), k))
+        candidates = np.empty((len(points), k), dtype=np.int64)
+        all_points = np.arange(len(self.coords))
+        for start in range(0, len(points), NucleonGrid._BRUTE_FORCE_CHUNK):
+            chunk = points[start:start + NucleonGrid._BRUTE_FORCE_CHUNK]
+            chunk_candidates = np.broadcast_to(all_points, (len(chunk), len(all_points)))
+            sq_distances[start:start + len(chunk)], candidates[start:start + len(chunk)] = self._nearest_of_candidates(chunk, chunk_candidates, k)
+        return sq_distances, candidates
+
+    def query(self, points, k=1):
+        """Finds the `k` closest points to each of the (M, D) query points
+        Points with fewer dimensions than the grid, like 2D points for a 3D nucleus, are taken to have 0 for the rest
+        Returns (M, k) arrays of squared distances and of nucleon indices, closest first
+        """
+        points = _as_query_points(points, self.dimensions)
+        k = min(k, len(self.coords))
+        sq_distances = np.empty((len(points), k))
+        candidates = np.empty((len(points), k), dtype=np.int64)
+
+        cells = np.floor(points / self.cell_size).astype(np.int64) - self.origin
+        pending = np.arange(len(points))
+        ring = 1
+        while len(pending) > 0:
+            if (2 * ring + 1) ** self.dimensions * self.table.shape[1] >= len(self.coords):
+                # The search would look at least at as many candidates as there are points, so just compare against everything
+                sq_distances[pending], candidates[pending] = self._brute_force(points[pending], k)
+                break
+
+            # Look at all the cells within `ring` cells of each query point
+            offsets = np.arange(-ring, ring + 1)
+            offsets = np.stack(np.meshgrid(*[offsets] * self.dimensions, indexing="ij"), axis=-1).reshape(-1, self.dimensions)
+            neighbour_cells = cells[pending, None, :] + offsets
+            inside = ((neighbour_cells >= 0) & (neighbour_cells < self.shape)).all(axis=2)
+            cell_ids = np.where(inside, neighbour_cells @ self.strides, 0)
+            ring_candidates = np.where(inside[:, :, None], self.table[cell_ids], -1).reshape(len(pending), -1)
+            found_sq_distances, found = self._nearest_of_candidates(points[pending], ring_candidates, k)
+
+            # Anything outside the searched cells is further than `ring` cells away, so the result is final if the k-th point is closer than that
+            # Allow for a little rounding error when the points were put in their cells
+            done = found_sq_distances[:, -1] <= (ring * self.cell_size) ** 2 * (1 - 1e-9)
+            sq_distances[pending[done]] = found_sq_distances[done]
+            candidates[pending[done]] = found[done]
+            pending = pending[~done]
+            ring *= 2
+
+        return sq_distances, self.indices[candidates]
+
+class NucleonIndex:
+    """The grids over the nucleons of each type of a nucleus, and over all of them, each built the first time it is needed
+    Small queries compare against every nucleon of the type instead, which is faster than building and searching a grid
+    """
+    # Up to this many distances (query points times nucleons), a query scans all the nucleons instead of using a grid
+    LINEAR_SCAN_LIMIT = 8192
+
+    def __init__(self, coords, types, cell_size):
+        self.coords = np.asarray(coords, dtype=float)
+        self.types = np.asarray(types)
+        self.cell_size = cell_size
+        self._indices = {}
+        self._grids = {}
+
+    def get_indices(self, filter_type=None):
+        """Returns the sorted indices of the nucleons of the given type, or of all of them"""
+        if filter_type not in self._indices:
+            if filter_type is None:
+                self._indices[filter_type] = np.arange(len(self.types))
+            else:
+                self._indices[filter_type] = np.flatnonzero(self.types == filter_type)
+        return self._indices[filter_type]
+
+    def get_grid(self, filter_type=None):
+        if filter_type not in self._grids:
+            indices = self.get_indices(filter_type)
+            self._grids[filter_type] = NucleonGrid(self.coords[indices], indices, self.cell_size)
+        return self._grids[filter_type]
+
+    def query(self, positions, filter_type=None, k=1):
+        """Finds the `k` closest nucleons of the given type (or of any type) to each of the positions
+        Returns an (M, k) array of nucleon indices, closest first
+        """
+        indices = self.get_indices(filter_type)
+        if len(indices) == 0:
+            raise ValueError("There are no nucleons of this type in the nucleus")
+        points = _as_query_points(positions, self.coords.shape[1])
+        if len(points) * len(indices) > NucleonIndex.LINEAR_SCAN_LIMIT:
+            return self.get_grid(filter_type).query(points, k)[1]
+        # A stable sort breaks ties in favour of lower indices, like the grid does
+        sq_distances = ((points[:, None, :] - self.coords[indices][None, :, :]) ** 2).sum(axis=2)
+        return indices[np.argsort(sq_distances, axis=1, kind="stable")[:, :k]]
+
+def select_closest(sq_distances, count):
+    """Returns the sorted indices of the `count` smallest distances in linear time
+    Ties are broken in favour of lower indices, just like a stable sort would
+    """
+    if count >= len(sq_distances):
+        return np.arange(len(sq_distances))
+    if count <= 0:
+        return np.array([], dtype=np.int64)
+    kth = np.partition(sq_distances, count - 1)[count - 1]
+    closer = np.flatnonzero(sq_distances < kth)
+    ties = np.flatnonzero(sq_distances == kth)[:count - len(closer)]
+    return np.sort(np.concatenate([closer, ties]))
+
+def partition_for_decay(coords, types, num_protons, num_neutrons, start_position):
+    """Splits the indices of the nucleons with the given coords and types into the ones that go into each of two daughter nuclei
+    The first daughter gets the `num_protons` protons and `num_neutrons` neutrons closest to `start_position`
+    """
+    # A 2D start position in a 3D nucleus is taken to be at a z of 0
+    start_position = np.asarray(start_position, dtype=float)
+    start_position = np.pad(start_position, (0, max(coords.shape[1] - len(start_position), 0)))
+    # Note: using squared distance to save computing power
+    sq_distances = ((coords - start_position) ** 2).sum(axis=1)
+
+    # Collect the nucleons into the first daughter nucleus by a quota for each type
+    in_daughter1 = np.zeros(len(coords), dtype=bool)
+    for type, quota in ((PROTON, num_protons), (NEUTRON, num_neutrons)):
+        of_type = np.flatnonzero(types == type)
+        in_daughter1[of_type[select_closest(sq_distances[of_type], quota)]] = True
+    # Keep each list sorted so that nucleons do not change position too much
+    return np.flatnonzero(in_daughter1), np.flatnonzero(~in_daughter1)
+
+# Up to how many nucleons `assign_min_cost` finds the exact minimum cost matching
+ASSIGNMENT_EXACT_LIMIT = 256
+
+def _hungarian(cost):
+    """Solves the square assignment problem exactly with the Hungarian algorithm, in O(n^3) with the inner loop vectorised
+    Returns the row assigned to each column
+    """
+    n = cost.shape[0]
+    # Potentials of the rows and columns, and the row matched to each column, all shifted by one so that 0 means none
+    u = np.zeros(n + 1)
+    v = np.zeros(n + 1)
+    matched_row = np.zeros(n + 1, dtype=np.int64)
+    way = np.zeros(n + 1, dtype=np.int64)
+    for row in range(1, n + 1):
+        matched_row[0] = row
+        column = 0
+        min_reduced = np.full(n + 1, np.inf)
+        used = np.zeros(n + 1, dtype=bool)
+        # Grow a tree of alternating paths until it reaches a free column
+        while matched_row[column] != 0:
+            used[column] = True
+            current_row = matched_row[column]
+            free = ~used[1:]
+            reduced = cost[current_row - 1] - u[current_row] - v[1:]
+            improved = free & (reduced < min_reduced[1:])
+            min_reduced[1:][improved] = reduced[improved]
+            way[1:][improved] = column
+            candidates = np.where(free, min_reduced[1:], np.inf)
+            next_column = int(np.argmin(candidates)) + 1
+            delta = candidates[next_column - 1]
+            u[matched_row[used]] += delta
+            v[used] -= delta
+            min_reduced[1:][free] -= delta
+            column = next_column
+        # Flip the path that was found
+        while column != 0:
+            previous = way[column]
+            matched_row[column] = matched_row[previous]
+            column = previous
+    return matched_row[1:] - 1
+
+def _greedy_assignment(old_coords, new_coords, cell_size):
+    """Approximates the assignment in rounds: every unassigned old point proposes to its closest free new point, and
+    every new point accepts its closest proposal. The closest remaining pair always matches, so every round makes progress
+    Returns the old index assigned to each new point
+    """
+    n = len(old_coords)
+    sources = np.full(n, -1, dtype=np.int64)
+    free_old = np.arange(n)
+    free_new = np.arange(n)
+    while len(free_old) > 0:
+        grid = NucleonGrid(new_coords[free_new], free_new, cell_size)
+        sq_distances, nearest = grid.query(old_coords[free_old], 1)
+        sq_distances = sq_distances[:, 0]
+        nearest = nearest[:, 0]
+        # Sort the proposals by the new point, then by distance, and keep the first one for every new point
+        order = np.lexsort((free_old, sq_distances, nearest))
+        is_first = np.ones(len(order), dtype=bool)
+        is_first[1:] = nearest[order[1:]] != nearest[order[:-1]]
+        accepted = order[is_first]
+        sources[nearest[accepted]] = free_old[accepted]
+
+        is_assigned = np.zeros(n, dtype=bool)
+        is_assigned[free_old[accepted]] = True
+        free_old = free_old[~is_assigned[free_old]]
+        free_new = free_new[sources[free_new] < 0]
+    return sources
+
+def assign_min_cost(old_coords, new_coords, exact_limit=ASSIGNMENT_EXACT_LIMIT):
+    """Matches every new position to an old one, so that the total distance travelled is as small as possible
+    Up to `exact_limit` points, this solves the minimum cost matching on the full NumPy distance matrix. Minimising the
+    total distance also means that no two paths cross. Above it, a greedy nearest neighbour matching is used instead
+    Returns the index of the old position assigned to each new position
+    """
+    old_coords = np.asarray(old_coords, dtype=float).reshape(len(old_coords), -1)
+    new_coords = np.asarray(new_coords, dtype=float).reshape(len(new_coords), -1)
+    if len(old_coords) != len(new_coords):
+        raise ValueError("There have to be as many new positions as old ones")
+    if len(old_coords) <= exact_limit:
+        cost = np.linalg.norm(old_coords[:, None, :] - new_coords[None, :, :], axis=2)
+        return _hungarian(cost)
+    # Aim for about one point per cell, in as many dimensions as the points have
+    extent = np.ptp(np.concatenate([old_coords, new_coords]), axis=0).max()
+    return _greedy_assignment(old_coords, new_coords, extent / len(old_coords) ** (1 / old_coords.shape[1]) or 1)
+
+def assign_by_type(old_coords, old_types, new_coords, new_types, exact_limit=ASSIGNMENT_EXACT_LIMIT):
+    """Like `assign_min_cost`, but only matches particles of the same type to each other"""
+    old_types = np.asarray(old_types)
+    new_types = np.asarray(new_types)
+    sources = np.empty(len(new_types), dtype=np.int64)
+    for type in np.unique(np.concatenate([old_types, new_types])):
+        old_of_type = np.flatnonzero(old_types == type)
+        new_of_type = np.flatnonzero(new_types == type)
+        if len(old_of_type) != len(new_of_type):
+            raise ValueError(f"There are {len(old_of_type)} old and {len(new_of_type)} new particles of type {type}")
+        sources[new_of_type] = old_of_type[assign_min_cost(old_coords[old_of_type], new_coords[new_of_type], exact_limit)]
+    return sources
+
+def plan_decay(coords, types, num_protons, num_neutrons, start_position, nucleon_separation, particle_num_difference,
+               three_d=False, minimise_motion=False):
+    """Like `partition_for_decay`, but if `minimise_motion` is set, each part is reordered so that laying out a daughter
+    nucleus in that order moves its nucleons as little as possible
+    The old and new positions are both taken relative to their mean, as the daughter nucleus can be moved anywhere
+    """
+    parts = partition_for_decay(coords, types, num_protons, num_neutrons, start_position)
+    if not minimise_motion:
+        return parts
+    ordered = []
+    for indices in parts:
+        if len(indices) > 0:
+            old_coords = coords[indices]
+            new_coords = layout(len(indices), nucleon_separation, particle_num_difference, three_d)[0]
+            indices = indices[assign_min_cost(old_coords - old_coords.mean(axis=0), new_coords - new_coords.mean(axis=0))]
+        ordered.append(indices)
+    return tuple(ordered)
+
+# One step of a decay chain. `site` is where the decay happens, as an offset from the centre of the parent
+# `sources` holds the index in the parent of every nucleon of the daughter, `emitted` the indices of the nucleons that
+# leave it, and `converted` the index of the nucleon that changes its type (or -1). `types`, `z_indices`, `coords` and
+# `layer_offsets` describe the daughter
+DecayStep = collections.namedtuple("DecayStep", ["mode", "site", "sources", "emitted", "converted", "types", "z_indices", "coords", "layer_offsets"])
+
+def plan_decay_chain(types, z_indices, modes, nucleon_separation, particle_num_difference, seed=1, three_d=False):
+    """Plans every step of a chain of decays using only the arrays of types and z-indices, without building any nuclei
+    Every daughter is laid out with `layout`
+    Each decay happens at a random point on the surface of its parent
+    Returns a list of `DecayStep`
+    """
+    rng = np.random.default_rng(seed)
+    types = np.asarray(types, dtype=np.int64)
+    z_indices = np.asarray(z_indices, dtype=np.int64)
+    steps = []
+    coords = layout(len(types), nucleon_separation, particle_num_difference, three_d)[0]
+    for mode in modes:
+        if three_d:
+            direction = rng.normal(size=3)
+        else:
+            angle = rng.uniform(0, 2 * np.pi)
+            direction = np.array([np.cos(angle), np.sin(angle)])
+        radius = np.linalg.norm(coords, axis=1).max(initial=0) + nucleon_separation
+        site = radius * direction / np.linalg.norm(direction)
+
+        sources = np.arange(len(types))
+        emitted = np.array([], dtype=np.int64)
+        converted = -1
+        new_types = types
+        if mode == ALPHA:
+            emitted, sources = partition_for_decay(coords, types, 2, 2, site)
+            if len(emitted) != 4:
+                raise ValueError("An alpha decay needs at least 2 protons and 2 neutrons")
+        elif mode in (BETA_MINUS, BETA_PLUS):
+            old_type, new_type = (NEUTRON, PROTON) if mode == BETA_MINUS else (PROTON, NEUTRON)
+            candidates = np.flatnonzero(types == old_type)
+            if len(candidates) == 0:
+                raise ValueError(f"A {mode} decay needs a nucleon of type {old_type}")
+            converted = int(candidates[select_closest(((coords[candidates] - site) ** 2).sum(axis=1), 1)[0]])
+            new_types = types.copy()
+            new_types[converted] = new_type
+        elif mode == GAMMA_DECAY:
+            # The nucleons rearrange themselves into a lower energy state
+            sources = rng.permutation(len(types))
+        else:
+            raise ValueError(f"Unknown decay mode {mode!r}, expected one of {DECAY_MODES}")
+
+        types = new_types[sources]
+        z_indices = z_indices[sources]
+        coords, layer_offsets = layout(len(types), nucleon_separation, particle_num_difference, three_d)
+        steps.append(DecayStep(mode, site, sources, emitted, converted, types, z_indices, coords, layer_offsets))
+    return steps
+
+def get_forces(coords, types, fm_per_unit, coulomb_strength=1.0, strong_force_range=forces.STRONG_FORCE_RANGE,
+               strong_force_shape=(forces.STRONG_FORCE_A, forces.STRONG_FORCE_B, forces.STRONG_FORCE_C)):
+    """Returns the Coulomb and strong forces on particles of the given types at the given 2D coordinates, as two (N, 2) arrays
+    The coordinates are converted to fm with `fm_per_unit`. The kernels only work in the plane, so 3D coordinates raise
+    """
+    coords = np.asarray(coords, dtype=float)
+    if coords.shape != (len(types), 2):
+        raise ValueError(f"Expected the 2D coordinates of {len(types)} particles, got an array of shape {coords.shape}")
+    coords = coords * fm_per_unit
+    coulomb = forces.coulomb_forces(coords, get_charges(types), coulomb_strength)
+    strong = forces.strong_forces(coords, strong_force_range, *strong_force_shape)
+    return coulomb, strong
+
+def get_binding(coords, types, fm_per_unit, **kwargs):
+    """How strongly each particle is held in by the net force, negative for the ones being pushed out
+    The keyword arguments are passed to `get_forces`
+    """
+    coulomb, strong = get_forces(coords, types, fm_per_unit, **kwargs)
+    return forces.radial_binding(coords, coulomb + strong)
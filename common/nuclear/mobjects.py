@@ -0,0 +1,1161 @@
+"""The manim mobjects of nuclei and particles, drawn from the data model in `common.nuclear.core`"""
+import manim as _m
+import numpy as np
+import random
+import functools
+import hashlib
+
+from common import util
+from common import forces
+from common.nuclear import core
+from common.nuclear import store
+from common.nuclear.core import PROTON, NEUTRON, ELECTRON, POSITRON, NEUTRINO, GAMMA
+
+@functools.lru_cache(maxsize=1)
+def _unit_circle_points():
+    """The bezier points of a unit circle around the origin, shared by all compactly drawn nucleons"""
+    points = _m.Circle(radius=1).points.copy()
+    points.flags.writeable = False
+    return points
+
+def _digest_mobject_state(mobject):
+    """Hashes the raw bytes of the points and colours of a mobject and its submobjects
+    This is done in C, unlike manim's own hashing, which turns every array into JSON
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for m in mobject.get_family():
+        for name in ("points", "fill_rgbas", "stroke_rgbas", "background_stroke_rgbas"):
+            array = getattr(m, name, None)
+            if array is not None:
+                digest.update(np.ascontiguousarray(array, dtype=float).tobytes())
+        digest.update(repr((m.z_index, getattr(m, "stroke_width", None), len(m.submobjects))).encode())
+    return digest.hexdigest()
+
+def install_fingerprint_hashing():
+    """Makes manim's partial movie cache use `get_fingerprint` for our mobjects instead of serialising all of their attributes
+    This changes how manim hashes every scene in the process, so it is opt-in: a scene module that wants it calls it once
+    """
+    try:
+        from manim.utils import hashing
+        encoder = hashing._CustomEncoder
+    except (ImportError, AttributeError):
+        # Only an optimisation, so just let manim hash everything if its internals have changed
+        return
+    if getattr(encoder.default, "_uses_fingerprints", False):
+        return
+    original_default = encoder.default
+
+    def default(self, obj):
+        if isinstance(obj, (Particle, Nucleus)):
+            return obj.get_fingerprint()
+        return original_default(self, obj)
+    default._uses_fingerprints = True
+    encoder.default = default
+
+def _to_point(coords):
+    """Pads 2D coordinates with a z of 0, so that the coordinates of both 2D and 3D nuclei can be used as points in the scene"""
+    coords = np.asarray(coords, dtype=float)
+    return np.concatenate([coords, np.zeros(coords.shape[:-1] + (3 - coords.shape[-1],))], axis=-1)
+
+def _get_circle_points(centers, radii):
+    """The bezier points of many circles at once, as a single (N * points per circle, 3) array"""
+    return (centers[:, None, :] + radii[:, None, None] * _unit_circle_points()).reshape(-1, 3)
+
+def _make_circle_batches(centers, radii, types, z_indices):
+    """Draws many particles with a few mobjects, one per (z-index, charge), with every circle being a separate closed subpath
+    Returns the mobjects and the indices of the particles drawn by each of them
+    """
+    charges = Particle._get_charges(types)
+    # Group the particles that can be drawn by the same mobject together
+    keys = np.asarray(z_indices) * 3 + (charges + 1)
+    order = np.argsort(keys, kind="stable")
+    unique_keys, starts = np.unique(keys[order], return_index=True)
+    ends = np.append(starts[1:], len(order))
+
+    batches = []
+    batch_indices = []
+    for key, start, end in zip(unique_keys, starts, ends):
+        indices = order[start:end]
+        z_index, shifted_charge = divmod(int(key), 3)
+        batch = _new_circle_batch(z_index, shifted_charge - 1)
+        batch.set_points(_get_circle_points(centers[indices], radii[indices]))
+        batches.append(batch)
+        batch_indices.append(indices)
+    return batches, batch_indices
+
+def _new_circle_batch(z_index, charge):
+    """An empty batch, styled for particles of the given charge"""
+    color = Particle._colors_by_charge[charge]
+    batch = _m.VMobject(z_index=z_index)
+    batch.set_stroke(color[0], opacity=1)
+    batch.set_fill(color[1], opacity=1)
+    return batch
+
+# How many pre-styled particles to keep, one per (class, type, size multiplier)
+_PROTOTYPE_CACHE_SIZE = 64
+
+@functools.lru_cache(maxsize=_PROTOTYPE_CACHE_SIZE)
+def _get_prototype(cls, type, size_multiplier):
+    """A styled particle at the origin to clone new particles from"""
+    return cls._make_prototype(type, size_multiplier)
+
+@functools.lru_cache(maxsize=None)
+def _get_style_rgbas(charge):
+    """The outline and fill colours of particles with the given charge, as the rows manim stores them in"""
+    rgbas = tuple(_m.color_to_rgba(color, 1)[None] for color in Particle._colors_by_charge[charge])
+    for array in rgbas:
+        array.flags.writeable = False
+    return rgbas
+
+class Particle(_m.Circle):
+    _colors_by_charge = {
+        # [oultine, fill]
+        1: [_m.RED, "#ce1616"],
+        0: [_m.WHITE, "#e8e8e8"],
+        -1: [_m.BLUE, "#5d96ea"],
+    }
+
+    _is_nucleon = core.is_nucleon
+    _get_charge = core.get_charge
+    _get_drawn_size = core.get_drawn_size
+    _get_charges = core.get_charges
+    _get_drawn_sizes = core.get_drawn_sizes
+
+    def __init__(self, type, size_multiplier, **kwargs): 
+        super().__init__(radius=1, **kwargs)
+
+        self.size_multiplier = size_multiplier
+        
+        self.set_particle_type(type)
+
+    @classmethod
+    def from_prototype(cls, type, size_multiplier, z_index=0):
+        """Makes a particle by cloning a cached, already styled one, which is much cheaper than building a new Circle"""
+        particle = _get_prototype(cls, type, size_multiplier).copy()
+        particle.z_index = z_index
+        return particle
+
+    @classmethod
+    def _make_prototype(cls, type, size_multiplier):
+        return cls(type, size_multiplier)
+
+    def get_fingerprint(self):
+        """A compact, deterministic description of the particle, used by manim to decide if a partial movie can be reused"""
+        return f"{self.__class__.__name__}:{self.type}:{self.size_multiplier}:{_digest_mobject_state(self)}"
+
+    def set_particle_type(self, type):
+        # Change the radius, unless it stays the same, like when a proton turns into a neutron
+        new_radius = Particle._get_drawn_size(type) * self.size_multiplier
+        if new_radius != self.radius:
+            self.scale(new_radius / self.radius)
+            self.radius = new_radius
+        
+        self.type = type
+        self.charge = Particle._get_charge(type)
+        # Only restyle if the colours are not the ones of the charge. Comparing the charges alone would miss particles
+        # that have been recoloured since
+        stroke_rgbas, fill_rgbas = _get_style_rgbas(self.charge)
+        if not (np.array_equal(self.stroke_rgbas, stroke_rgbas) and np.array_equal(self.fill_rgbas, fill_rgbas)):
+            color = Particle._colors_by_charge[self.charge]
+            self.set_stroke(color[0], opacity=1)
+            self.set_fill(color[1], opacity=1)
+
+class ParticleLabel(_m.MathTex):
+    
+    def _get_label_tex(type):
+        if type == ELECTRON:
+            return r"e^-"
+        elif type == POSITRON:
+            return r"e^+"
+        elif type == PROTON:
+            return r"p^+"
+        elif type == NEUTRON:
+            return r"n"
+        elif type == GAMMA:
+            return r"\gamma"
+        else:
+            return ""
+        
+    def __init__(self, particle, font_size, label_override=None, tracker=None, **kwargs):
+        """If a `LabelTracker` is given, it keeps the label on the particle instead of an updater of the label's own"""
+        if label_override is not None:
+            label_tex = label_override
+        else:
+            label_tex = ParticleLabel._get_label_tex(particle.type)
+        super().__init__(label_tex, font_size=font_size, z_index=particle.z_index + 1, **kwargs)
+        self.move_to(particle)
+        if tracker is not None:
+            tracker.track(self, particle)
+        else:
+            self.add_updater(lambda x: x.move_to(particle))
+
+class LabelTracker(_m.Mobject):
+    """Keeps any number of labels on their particles with a single updater
+    It is invisible, but has to be added to the scene for its updater to run. The labels themselves are not its submobjects,
+    so they are added to and removed from the scene as usual
+    """
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.labels = []
+        self.particles = []
+        # Where each particle was when its label was last moved
+        self._last_centers = np.zeros((0, 3))
+        self.add_updater(lambda tracker: tracker.update_labels())
+
+    def track(self, label, particle):
+        label.move_to(particle)
+        self.labels.append(label)
+        self.particles.append(particle)
+        self._last_centers = np.vstack([self._last_centers, particle.get_center()])
+        return self
+
+    def untrack(self, label):
+        i = self.labels.index(label)
+        del self.labels[i]
+        del self.particles[i]
+        self._last_centers = np.delete(self._last_centers, i, axis=0)
+        return self
+
+    def update_labels(self):
+        if len(self.particles) == 0:
+            return
+        centers = np.array([p.get_center() for p in self.particles])
+        # Only move the labels of the particles that have moved
+        deltas = centers - self._last_centers
+        for i in np.flatnonzero(np.any(deltas != 0, axis=1)):
+            self.labels[i].shift(deltas[i])
+        self._last_centers = centers
+
+class _TypeChanges:
+    """Counts the type changes of the nucleons of one nucleus, so that it can tell when its spatial index is out of date
+    It is shared by the nucleus and its nucleons, and copied along with them
+    """
+    def __init__(self):
+        self.count = 0
+
+class Nucleus(_m.VGroup):
+    class Nucleon(Particle):
+        """Represents a particle with its offset from the centre of the nucleus"""
+        # The `_TypeChanges` of the nucleus the nucleon is in, if any
+        _type_changes = None
+
+        def __init__(self, type, size_multiplier, coords, **kwargs):
+            super().__init__(type, size_multiplier, **kwargs)
+            self.coords = coords
+            self.shift(_to_point(coords))
+
+        @classmethod
+        def from_prototype(cls, type, size_multiplier, coords, z_index=0):
+            nucleon = super().from_prototype(type, size_multiplier, z_index)
+            nucleon.coords = coords
+            nucleon.shift(_to_point(coords))
+            return nucleon
+
+        @classmethod
+        def _make_prototype(cls, type, size_multiplier):
+            return cls(type, size_multiplier, (0, 0))
+
+        def set_particle_type(self, type):
+            super().set_particle_type(type)
+            if self._type_changes is not None:
+                self._type_changes.count += 1
+
+    class CompactNucleon:
+        """A lightweight handle to a nucleon of a compact nucleus, used in place of `Nucleon`
+        The nucleon itself is stored in the arrays of the nucleus and drawn by one of its batched mobjects
+        """
+        def __init__(self, nucleus, index, coords):
+            self.nucleus = nucleus
+            self.index = index
+            self.coords = coords
+
+        @property
+        def type(self):
+            return int(self.nucleus._compact_types[self.index])
+
+        @property
+        def charge(self):
+            return Particle._get_charge(self.type)
+
+        @property
+        def z_index(self):
+            return int(self.nucleus._compact_z_indices[self.index])
+
+        @property
+        def radius(self):
+            points = self.nucleus._get_compact_nucleon_points(self.index)
+            return np.linalg.norm(points[0] - points.mean(axis=0))
+
+        @property
+        def animate(self):
+            """Only supports `set_particle_type`, as in `nucleon.animate.set_particle_type(PROTON)`"""
+            return Nucleus._CompactNucleonAnimations(self)
+
+        def get_center(self):
+            return self.nucleus._get_compact_nucleon_points(self.index).mean(axis=0)
+
+        def __array__(self, dtype=None, copy=None):
+            # Lets a handle stand in for its centre, as in `particle.move_to(nucleon)`
+            return np.asarray(self.get_center(), dtype=dtype)
+
+        def set_particle_type(self, type):
+            self.nucleus._set_compact_particle_types([self.index], type)
+            return self
+
+    class _CompactNucleonAnimations:
+        """What `CompactNucleon.animate` returns, it makes an animation instead of changing the nucleon straight away"""
+        def __init__(self, nucleon):
+            self.nucleon = nucleon
+
+        def set_particle_type(self, type):
+            return _CompactTypeChange(self.nucleon, type)
+
+    def _generate_full_nucleus_pattern(number_of_particles, nucleon_separation, particle_num_difference):
+        """Generate positions that evenly spread `number_of_particles` particles
+        This is done by drawing progressively larger concentric circles of particles
+        Returns an (N, 2) array of positions and the offsets of each layer in it
+        """
+        return core.layout_nucleus(number_of_particles, nucleon_separation, particle_num_difference)
+
+    def _generate_pattern(self, number_of_particles):
+        return core.layout(number_of_particles, self.nucleon_separation, self.particle_num_difference, self.three_d)
+    
+    def __init__(self, compact=False, three_d=False):
+        """If `compact` is set, the nucleons are not separate Circles, but are drawn in bulk by a few batched mobjects
+        There is one batch per (z-index, charge), so the number of mobjects does not grow with the number of nucleons
+        If `three_d` is set, the nucleons are laid out on concentric spheres instead of circles, for use in a ThreeDScene,
+        and `particle_num_difference` is not used. See `add_depth_sorting`
+        """
+        super().__init__()
+        self.nucleons = []
+        self.compact = compact
+        self.three_d = three_d
+        self._construction = None
+        self._type_changes = _TypeChanges()
+        self._invalidate_nucleon_caches()
+
+    def init_from_nums(self, num_protons, num_neutrons, nucleon_separation, particle_num_difference, nucleon_size_multiplier, shuffle=True, seed=1):
+        # Use an RNG of our own, so that the result only depends on the arguments
+        self.rng = random.Random(seed)
+        self._construction = ("nums", num_protons, num_neutrons, nucleon_separation, particle_num_difference, nucleon_size_multiplier, shuffle, seed)
+        self.nucleon_separation = nucleon_separation
+        self.particle_num_difference = particle_num_difference
+        self.nucleon_size_multiplier = nucleon_size_multiplier
+    
+        # Make a random list of neutrons and protons
+        nucleon_types = [PROTON] * num_protons + [NEUTRON] * num_neutrons
+        self.rng.shuffle(nucleon_types)
+    
+        pattern = self._generate_pattern(num_protons + num_neutrons)
+
+        # In 3D, depth sorting decides which nucleons cover which instead
+        if shuffle and not self.three_d:
+            # Give random z indices to have a varying overlapping structure
+            z_indices = [self.rng.randint(0, 10) for _ in range(len(nucleon_types))]
+        else:
+            # Otherwise, have the z-indices of 0
+            z_indices = [0] * len(nucleon_types)
+        
+        self._init_from_pattern(pattern, nucleon_types, z_indices, nucleon_size_multiplier)
+        
+        return self
+
+    def _init_from_pattern(self, pattern, nucleon_types, z_indices, nucleon_size_multiplier):
+        self._invalidate_nucleon_caches()
+        if self.compact:
+            self._init_compact_from_pattern(pattern, nucleon_types, z_indices, nucleon_size_multiplier)
+            return
+
+        positions, layer_offsets = pattern
+        for start, end in zip(layer_offsets[:-1], layer_offsets[1:]):
+            nucleons_in_layer = []
+            for i in range(start, end):
+                nucleon = Nucleus.Nucleon.from_prototype(nucleon_types[i], nucleon_size_multiplier, positions[i], z_indices[i])
+                nucleon._type_changes = self._type_changes
+                self.add(nucleon)
+                nucleons_in_layer.append(nucleon)
+            self.nucleons.append(nucleons_in_layer)
+
+    def _init_compact_from_pattern(self, pattern, nucleon_types, z_indices, nucleon_size_multiplier):
+        positions, layer_offsets = pattern
+        self._compact_types = np.array(nucleon_types, dtype=np.int64)
+        self._compact_z_indices = np.array(z_indices, dtype=np.int64)
+        self._compact_batches = []
+
+        handles = [Nucleus.CompactNucleon(self, i, positions[i]) for i in range(len(positions))]
+        self.nucleons = [handles[start:end] for start, end in zip(layer_offsets[:-1], layer_offsets[1:])]
+
+        centers = _to_point(positions).reshape(-1, 3)
+        radii = Particle._get_drawn_sizes(self._compact_types) * nucleon_size_multiplier
+        self._build_compact_batches(centers, radii)
+
+    def _build_compact_batches(self, centers, radii):
+        """Generate the circles of all the nucleons in bulk
+        Every nucleon is a row of circle points in one of the batches. `_compact_batch_indices` holds the nucleons of each
+        batch in the order of their rows, and `_compact_batch_of` and `_compact_row_of` where each nucleon is drawn
+        """
+        self.remove(*self._compact_batches)
+        self._compact_batches, self._compact_batch_indices = _make_circle_batches(centers, radii, self._compact_types, self._compact_z_indices)
+        charges = Particle._get_charges(self._compact_types)
+        self._compact_batch_keys = [(int(self._compact_z_indices[i[0]]), int(charges[i[0]])) for i in self._compact_batch_indices]
+        self._compact_batch_of = np.empty(len(self._compact_types), dtype=np.int64)
+        self._compact_row_of = np.empty(len(self._compact_types), dtype=np.int64)
+        for batch, indices in enumerate(self._compact_batch_indices):
+            self._compact_batch_of[indices] = batch
+            self._compact_row_of[indices] = np.arange(len(indices))
+        self.add(*self._compact_batches)
+
+    def _get_compact_nucleon_points(self, index):
+        """The bezier points of the circle of one nucleon of a compact nucleus, without looking at any of the others"""
+        stride = len(_unit_circle_points())
+        row = self._compact_row_of[index]
+        return self._compact_batches[self._compact_batch_of[index]].points[row * stride:(row + 1) * stride]
+
+    def _get_compact_batch(self, z_index, charge):
+        """Returns the index of the batch that draws nucleons with the given z-index and charge, adding it if there is none"""
+        key = (z_index, charge)
+        if key not in self._compact_batch_keys:
+            batch = _new_circle_batch(z_index, charge)
+            self._compact_batches.append(batch)
+            self._compact_batch_indices.append(np.zeros(0, dtype=np.int64))
+            self._compact_batch_keys.append(key)
+            self.add(batch)
+        return self._compact_batch_keys.index(key)
+
+    def _get_compact_circle_points(self):
+        """Returns the bezier points of every nucleon of a compact nucleus as an (N, points per circle, 3) array"""
+        stride = len(_unit_circle_points())
+        points = np.empty((len(self._compact_types), stride, 3))
+        for batch, indices in zip(self._compact_batches, self._compact_batch_indices):
+            points[indices] = batch.points.reshape(len(indices), stride, 3)
+        return points
+
+    def _get_compact_centers(self):
+        # The bezier points of a circle are symmetric around its centre
+        return self._get_compact_circle_points().mean(axis=1)
+
+    def _get_compact_states(self, indices):
+        """Returns the centres, radii, fill colours and stroke colours of the nucleons at `indices` of a compact nucleus"""
+        points = self._get_compact_circle_points()[indices]
+        centers = points.mean(axis=1)
+        radii = np.linalg.norm(points[:, 0] - centers, axis=1)
+        batches = self._compact_batch_of[indices]
+        fills = np.array([batch.fill_rgbas[0] for batch in self._compact_batches]).reshape(-1, 4)[batches]
+        strokes = np.array([batch.stroke_rgbas[0] for batch in self._compact_batches]).reshape(-1, 4)[batches]
+        return centers, radii, fills, strokes
+
+    def _set_compact_particle_types(self, indices, type):
+        """Moves the circles of the nucleons into the batches of their new charge, without touching the rows of the others"""
+        indices = np.unique(indices)
+        if len(indices) == 0:
+            return
+        points = np.array([self._get_compact_nucleon_points(i) for i in indices.tolist()])
+        # Keep any scaling that has been applied to the nucleus
+        centers = points.mean(axis=1, keepdims=True)
+        scales = Particle._get_drawn_size(type) / Particle._get_drawn_sizes(self._compact_types[indices])
+        points = centers + (points - centers) * scales[:, None, None]
+        self._compact_types[indices] = type
+        self._spatial_index = None
+
+        # Take the rows out of their old batches, which moves the rows after them up
+        stride = len(_unit_circle_points())
+        is_moving = np.zeros(len(self._compact_types), dtype=bool)
+        is_moving[indices] = True
+        for batch in np.unique(self._compact_batch_of[indices]).tolist():
+            batch_indices = self._compact_batch_indices[batch]
+            keep = ~is_moving[batch_indices]
+            self._compact_batches[batch].set_points(self._compact_batches[batch].points.reshape(-1, stride, 3)[keep].reshape(-1, 3))
+            self._compact_batch_indices[batch] = batch_indices[keep]
+            self._compact_row_of[batch_indices[keep]] = np.arange(keep.sum())
+
+        # And add them to the end of the new ones
+        z_indices = self._compact_z_indices[indices]
+        for z_index in np.unique(z_indices).tolist():
+            in_group = z_indices == z_index
+            group = indices[in_group]
+            batch = self._get_compact_batch(z_index, Particle._get_charge(type))
+            start = len(self._compact_batch_indices[batch])
+            self._compact_batches[batch].set_points(np.concatenate([self._compact_batches[batch].points, points[in_group].reshape(-1, 3)]))
+            self._compact_batch_indices[batch] = np.append(self._compact_batch_indices[batch], group)
+            self._compact_batch_of[group] = batch
+            self._compact_row_of[group] = start + np.arange(len(group))
+
+    def init_from_nucleons(self, nucleons_list, nucleon_separation, particle_num_difference, nucleon_size_multiplier, shuffle, seed=1):
+        self.rng = random.Random(seed)
+        self._construction = ("nucleons", len(nucleons_list), nucleon_separation, particle_num_difference, nucleon_size_multiplier, shuffle, seed)
+        self.nucleon_separation = nucleon_separation
+        self.particle_num_difference = particle_num_difference
+        self.nucleon_size_multiplier = nucleon_size_multiplier
+        
+        pattern = self._generate_pattern(len(nucleons_list))
+
+        nucleon_types = list(map(lambda n: n.type, nucleons_list))
+
+        if shuffle and not self.three_d:
+            # Give random z indices to have a varying overlapping structure
+            z_indices = [self.rng.randint(0, 10) for _ in range(len(nucleon_types))]
+        else:
+            # Otherwise, preserve the z-indices
+            z_indices = list(map(lambda n: n.z_index, nucleons_list))
+        
+        self._init_from_pattern(pattern, nucleon_types, z_indices, nucleon_size_multiplier)
+        
+        return self
+
+    def _enforce_init(self):
+        if len(self.nucleons) == 0:
+            raise Exception("Please initialise the nucleus before using it")
+    
+    def create_anims(self, anim):
+        self._enforce_init()
+        if self.compact:
+            return map(lambda batch: anim(batch), self._compact_batches)
+        return map(lambda nucleon: anim(nucleon), self.get_nucleons_list())
+
+    def get_fingerprint(self):
+        """A compact, deterministic description of the nucleus, used by manim to decide if a partial movie can be reused
+        It is made of the construction parameters, the nucleon types and z-indices, and a digest of where everything has been moved to
+        """
+        if len(self.nucleons) == 0:
+            arrays = ""
+        else:
+            arrays = hashlib.blake2b(self.get_nucleon_types().tobytes() + self.get_nucleon_z_indices().tobytes(), digest_size=8).hexdigest()
+        return f"Nucleus:{self._construction}:{self.compact}:{self.three_d}:{arrays}:{_digest_mobject_state(self)}"
+
+    def _invalidate_nucleon_caches(self):
+        """Forget the flattened views of the nucleons, needs to be called whenever the nucleus is rebuilt"""
+        self._nucleons_list = None
+        self._nucleon_coords = None
+        self._spatial_index = None
+        self._spatial_index_version = self._type_changes.count
+
+    def get_nucleons_list(self):
+        """Returns all the nucleons, layer by layer
+        The result is cached and shared, so it is a tuple. Copy it into a list to modify it
+        """
+        if self._nucleons_list is None:
+            self._nucleons_list = tuple(util.flatten(self.nucleons))
+        return self._nucleons_list
+
+    def get_nucleon_coords(self):
+        """Returns a read-only (N, 2) array, or (N, 3) for a 3D nucleus, of the offsets of the nucleons from the centre, in the order of `get_nucleons_list`"""
+        if self._nucleon_coords is None:
+            coords = np.array([n.coords for n in self.get_nucleons_list()], dtype=float).reshape(-1, 3 if self.three_d else 2)
+            coords.flags.writeable = False
+            self._nucleon_coords = coords
+        return self._nucleon_coords
+
+    def get_nucleon_centers(self, indices=None):
+        """Returns the current centres of the nucleons in the scene as an (N, 3) array, optionally only the ones at `indices`"""
+        if self.compact:
+            centers = self._get_compact_centers()
+            return centers if indices is None else centers[indices]
+        nucleons_list = self.get_nucleons_list()
+        if indices is not None:
+            nucleons_list = [nucleons_list[i] for i in indices]
+        return np.array([n.get_center() for n in nucleons_list]).reshape(-1, 3)
+
+    def set_nucleon_types(self, indices, type):
+        """Changes the type of the nucleons at `indices` into `get_nucleons_list`, all at once in a compact nucleus"""
+        self._enforce_init()
+        if self.compact:
+            self._set_compact_particle_types(indices, type)
+            return self
+        nucleons_list = self.get_nucleons_list()
+        for i in np.unique(indices).tolist():
+            nucleons_list[i].set_particle_type(type)
+        return self
+
+    def get_nucleon_types(self):
+        """Returns an array of the current types of the nucleons, in the order of `get_nucleons_list`
+        This is not cached, because the type of a nucleon can be changed with `set_particle_type`
+        """
+        if self.compact:
+            return self._compact_types.copy()
+        nucleons_list = self.get_nucleons_list()
+        return np.fromiter((n.type for n in nucleons_list), dtype=np.int64, count=len(nucleons_list))
+    
+    def get_nucleon_z_indices(self):
+        """Returns an array of the z-indices of the nucleons, in the order of `get_nucleons_list`"""
+        if self.compact:
+            return self._compact_z_indices.copy()
+        nucleons_list = self.get_nucleons_list()
+        return np.fromiter((n.z_index for n in nucleons_list), dtype=np.int64, count=len(nucleons_list))
+
+    def get_layer_offsets(self):
+        """Returns the offsets of each layer into `get_nucleons_list`, outermost layer first"""
+        layer_offsets = np.zeros(len(self.nucleons) + 1, dtype=np.int64)
+        np.cumsum([len(layer) for layer in self.nucleons], out=layer_offsets[1:])
+        return layer_offsets
+
+    def _get_parameters(self):
+        return [self.nucleon_separation, self.particle_num_difference, self.nucleon_size_multiplier]
+
+    def to_arrays(self, prefix=""):
+        """Returns the arrays and the attributes that describe the nucleus, with names starting with `prefix`
+        `init_from_arrays` rebuilds the nucleus from them, and `store.save` writes them to a file
+        """
+        self._enforce_init()
+        return store.nucleus_to_arrays(
+            self.get_nucleon_types(), self.get_nucleon_coords(), self.get_nucleon_z_indices(), self.get_layer_offsets(), self._get_parameters(), prefix)
+
+    def init_from_arrays(self, arrays, attributes, prefix=""):
+        """Rebuilds a nucleus from the output of `to_arrays`, without generating its layout or using any randomness"""
+        types, coords, z_indices, layer_offsets, parameters = store.nucleus_from_arrays(arrays, attributes, prefix)
+        nucleon_separation, particle_num_difference, nucleon_size_multiplier = parameters
+        self.three_d = coords.shape[1] == 3
+        self._construction = ("arrays", len(types), nucleon_separation, particle_num_difference, nucleon_size_multiplier)
+        self.nucleon_separation = nucleon_separation
+        self.particle_num_difference = particle_num_difference
+        self.nucleon_size_multiplier = nucleon_size_multiplier
+
+        self._init_from_pattern((coords, layer_offsets), types.tolist(), z_indices.tolist(), nucleon_size_multiplier)
+        return self
+
+    def save(self, path):
+        store.save(path, *self.to_arrays())
+
+    def load(path, compact=False):
+        """Loads a nucleus written by `save`"""
+        return Nucleus(compact).init_from_arrays(*store.load(path))
+
+    def save_decay(self, path, num_protons, num_neutrons, start_position, shuffle1=True, shuffle2=True, seed=1, minimise_motion=False):
+        """Like `decay`, but also writes the parent, both daughters and the partition between them to `path`
+        `decay_from_file` can then repeat the decay in other processes without recomputing it
+        """
+        nucleon_indices = self._partition_for_decay(num_protons, num_neutrons, start_position, minimise_motion)
+        result = self.decay(num_protons, num_neutrons, start_position, shuffle1, shuffle2, seed, nucleon_indices=nucleon_indices)
+        daughter1, daughter2 = result[:2]
+        daughter1_nucleon_indices, daughter2_nucleon_indices = nucleon_indices
+        store.save_decay(path, self.to_arrays(), daughter1.to_arrays(), daughter2.to_arrays(), daughter1_nucleon_indices, daughter2_nucleon_indices)
+        return result
+
+    def decay_from_file(self, path):
+        """Repeats a decay written by `save_decay` on this nucleus, which has to be the same as the one that was saved
+        Returns the same as `decay`
+        """
+        daughter1, daughter2, daughter1_nucleon_indices, daughter2_nucleon_indices = store.load_decay(
+            path, self.get_nucleon_types(), self.get_nucleon_coords())
+        daughter1 = Nucleus(self.compact).init_from_arrays(*daughter1)
+        daughter2 = Nucleus(self.compact).init_from_arrays(*daughter2)
+        return self._pair_daughters(daughter1, daughter2, daughter1_nucleon_indices, daughter2_nucleon_indices)
+
+    def _partition_for_decay(self, num_protons, num_neutrons, start_position, minimise_motion=False):
+        """Splits the nucleon indices into the ones that go into each of the daughter nuclei, see `core.plan_decay`"""
+        return core.plan_decay(self.get_nucleon_coords(), self.get_nucleon_types(), num_protons, num_neutrons, start_position,
+                               self.nucleon_separation, self.particle_num_difference, self.three_d, minimise_motion)
+
+    def decay(self, num_protons, num_neutrons, start_position, shuffle1=True, shuffle2=True, seed=1, minimise_motion=False, particle_system=None,
+              nucleon_indices=None, gamma=False):
+        """Returns two daughter nuclei, one of which has the specified number of protons and neutrons, with Transform animations to get from one to another
+        If `minimise_motion` is set, the nucleons are placed in the daughters so that they move as little as possible, instead of in order
+        `nucleon_indices` can be a partition from `_partition_for_decay` that has already been computed, which is then used as it is
+        Set `gamma` for a decay that gives off a gamma ray. The result then has a fifth element, an animation that emits the
+        ray from `particle_system`, at the nucleon in the centre of the ones that leave with the first daughter. Play it
+        together with the pairs
+        The pairs of a compact nucleus hold `CompactNucleon` handles, so play them with `NucleusTransition`
+        """
+        if gamma and particle_system is None:
+            raise ValueError("A decay that gives off a gamma ray needs a particle system to emit it from")
+        nucleons_list = self.get_nucleons_list()
+        if nucleon_indices is None:
+            nucleon_indices = self._partition_for_decay(num_protons, num_neutrons, start_position, minimise_motion)
+        daughter1_nucleon_indices, daughter2_nucleon_indices = nucleon_indices
+
+        daughter1_nucleons = [nucleons_list[i] for i in daughter1_nucleon_indices]
+        daughter2_nucleons = [nucleons_list[i] for i in daughter2_nucleon_indices]
+        
+        daughter1 = Nucleus(self.compact, self.three_d).init_from_nucleons(
+            daughter1_nucleons, self.nucleon_separation, self.particle_num_difference, self.nucleon_size_multiplier, shuffle1, seed)
+        daughter2 = Nucleus(self.compact, self.three_d).init_from_nucleons(
+            daughter2_nucleons, self.nucleon_separation, self.particle_num_difference, self.nucleon_size_multiplier, shuffle2, seed)
+
+        result = self._pair_daughters(daughter1, daughter2, daughter1_nucleon_indices, daughter2_nucleon_indices)
+        if not gamma:
+            return result
+        site = self.get_nucleon_coords()[daughter1_nucleon_indices].mean(axis=0, keepdims=True)
+        return result + (_Emission(lambda: particle_system.emit_gamma(self, site)),)
+
+    def _pair_daughters(self, daughter1, daughter2, daughter1_nucleon_indices, daughter2_nucleon_indices):
+        """Returns the result of `decay`, pairing each nucleon with the one at the same position in its part of the partition"""
+        nucleons_list = self.get_nucleons_list()
+        daughter1_nucleons = daughter1.get_nucleons_list()
+        daughter2_nucleons = daughter2.get_nucleons_list()
+
+        # Reverse maps from the original index to the index in the daughter nucleus
+        is_in_daughter1 = np.zeros(len(nucleons_list), dtype=bool)
+        is_in_daughter1[daughter1_nucleon_indices] = True
+        new_indices = np.empty(len(nucleons_list), dtype=np.int64)
+        new_indices[daughter1_nucleon_indices] = np.arange(len(daughter1_nucleon_indices))
+        new_indices[daughter2_nucleon_indices] = np.arange(len(daughter2_nucleon_indices))
+
+        daughter1_pairs = []
+        daughter2_pairs = []
+        # Go through each original nucleon and find the daughter nucleon it ended up being
+        for nucleon, in_daughter1, new_index in zip(nucleons_list, is_in_daughter1.tolist(), new_indices.tolist()):
+            if in_daughter1:
+                daughter1_pairs.append((nucleon, daughter1_nucleons[new_index]))
+            else:
+                daughter2_pairs.append((nucleon, daughter2_nucleons[new_index]))
+
+        return (daughter1, daughter2, daughter1_pairs, daughter2_pairs)
+
+    def decay_chain(self, modes, seed=1, emission_distance=4, **kwargs):
+        """Decays the nucleus by each of the `modes` in turn (`ALPHA`, `BETA_MINUS`, `BETA_PLUS` or `GAMMA_DECAY`)
+        All the steps are planned straight away by `core.plan_decay_chain`. The returned generator then yields
+        (nucleus, animations) for each `play` call, where the nucleus is the one the animations lead to
+        Each nucleus is only built when it is reached, and dropped after the next step, so long chains use constant memory
+        The keyword arguments are passed to every animation. Only works with nuclei that are not compact
+        """
+        self._enforce_init()
+        if self.compact:
+            raise ValueError("Decay chains need nucleons that are separate mobjects")
+        steps = core.plan_decay_chain(
+            self.get_nucleon_types(), self.get_nucleon_z_indices(), modes, self.nucleon_separation, self.particle_num_difference, seed, self.three_d)
+        return self._animate_decay_chain(steps, emission_distance, kwargs)
+
+    def _animate_decay_chain(self, steps, emission_distance, animation_kwargs):
+        # Where the centre of the layout is in the scene
+        origin = self.get_nucleon_centers()[0] - _to_point(self.get_nucleon_coords()[0])
+        nucleus = self
+        for step in steps:
+            arrays = store.nucleus_to_arrays(step.types, step.coords, step.z_indices, step.layer_offsets, self._get_parameters())
+            daughter = Nucleus().init_from_arrays(*arrays).shift(origin)
+
+            old_nucleons = nucleus.get_nucleons_list()
+            pairs = list(zip([old_nucleons[i] for i in step.sources.tolist()], daughter.get_nucleons_list()))
+            direction = _to_point(step.site / np.linalg.norm(step.site))
+
+            if step.mode == core.ALPHA:
+                # The alpha particle leaves as a small nucleus of its own, then disappears
+                emitted = [old_nucleons[i] for i in step.emitted.tolist()]
+                alpha = Nucleus(three_d=self.three_d).init_from_nucleons(
+                    emitted, self.nucleon_separation, self.particle_num_difference, self.nucleon_size_multiplier, False)
+                alpha.move_to(origin + _to_point(step.site) + emission_distance * direction)
+                yield daughter, [NucleusTransition(pairs + list(zip(emitted, alpha.get_nucleons_list())), **animation_kwargs)]
+                yield daughter, [NucleusTransition.shrink(alpha.get_nucleons_list(), **animation_kwargs)]
+            else:
+                if step.mode == core.GAMMA_DECAY:
+                    particles = [(GAMMA, 0)]
+                    center = origin + _to_point(step.site)
+                else:
+                    beta_type = ELECTRON if step.mode == core.BETA_MINUS else POSITRON
+                    # Send the neutrino off at a slight angle to the beta particle
+                    particles = [(beta_type, 0), (NEUTRINO, np.pi / 6)]
+                    center = old_nucleons[step.converted].get_center()
+                animations = [NucleusTransition(pairs, **animation_kwargs)]
+                for type, angle in particles:
+                    particle = Particle.from_prototype(type, self.nucleon_size_multiplier, z_index=20).move_to(center)
+                    shift = emission_distance * _m.rotate_vector(direction, angle)
+                    animations.append(_m.FadeOut(particle, shift=shift, **animation_kwargs))
+                yield daughter, animations
+            nucleus = daughter
+
+    def add_depth_sorting(self, camera, z_index=0):
+        """Keeps the nucleons of a 3D nucleus facing the `camera` of a ThreeDScene, and drawn back to front, as it rotates"""
+        self.add_updater(lambda nucleus: nucleus.sort_by_depth(camera.get_rotation_matrix(), z_index))
+        return self
+
+    def sort_by_depth(self, rotation_matrix, z_index=0):
+        """Turns every nucleon towards the camera with the given rotation matrix, and orders them by their distance to it
+        This is one matrix product and one argsort for all the nucleons, which then get z-indices from `z_index` upwards
+        """
+        self._enforce_init()
+        if self.compact:
+            raise ValueError("Depth sorting needs nucleons that are separate mobjects")
+        nucleons_list = self.get_nucleons_list()
+        points = np.array([n.points for n in nucleons_list])
+        centers = points.mean(axis=1)
+        radii = np.linalg.norm(points[:, 0] - centers, axis=1)
+
+        # The rows of the rotation matrix are the directions of the camera's axes in the scene
+        right, up, towards_camera = np.asarray(rotation_matrix)
+        unit_points = _unit_circle_points()
+        facing_points = unit_points[:, :1] * right + unit_points[:, 1:2] * up
+        new_points = centers[:, None, :] + radii[:, None, None] * facing_points
+
+        # The closest nucleons are drawn last
+        ranks = np.empty(len(nucleons_list), dtype=np.int64)
+        ranks[np.argsort(centers @ towards_camera, kind="stable")] = np.arange(len(nucleons_list))
+        for nucleon, nucleon_points, rank in zip(nucleons_list, new_points, ranks.tolist()):
+            nucleon.points = nucleon_points
+            nucleon.z_index = z_index + rank
+        return self
+
+    def get_transition_pairs(self, other, exact_limit=core.ASSIGNMENT_EXACT_LIMIT):
+        """Pairs every nucleon with one of the same type in `other`, so that going from one nucleus to the other takes
+        as little motion as possible. Play the pairs with `NucleusTransition`, for example to reshuffle the nucleons in
+        a gamma decay, or to expand a nucleus and contract it again
+        """
+        sources = core.assign_by_type(
+            self.get_nucleon_centers(), self.get_nucleon_types(), other.get_nucleon_centers(), other.get_nucleon_types(), exact_limit)
+        nucleons_list = self.get_nucleons_list()
+        return list(zip([nucleons_list[i] for i in sources.tolist()], other.get_nucleons_list()))
+
+    def _get_spatial_index(self):
+        """Returns the `core.NucleonIndex` of the nucleus, building it the first time it is needed"""
+        # The index is only valid while none of the nucleons change their type. Compact nuclei forget their index themselves
+        if self._spatial_index is None or self._spatial_index_version != self._type_changes.count:
+            self._spatial_index = core.NucleonIndex(self.get_nucleon_coords(), self.get_nucleon_types(), self.nucleon_separation)
+            self._spatial_index_version = self._type_changes.count
+        return self._spatial_index
+
+    def find_closest_nucleon_indices(self, positions, filter_type=None, k=1):
+        """Finds the `k` closest nucleons to each of the positions, which are offsets from the centre like `coords`
+        In a 3D nucleus, 2D positions are taken to be at a z of 0
+        Returns an (M, k) array of indices into `get_nucleons_list`, closest first
+        """
+        self._enforce_init()
+        return self._get_spatial_index().query(positions, filter_type, k)
+
+    def find_closest_nucleons(self, positions, filter_type=None, k=1):
+        """Like `find_closest_nucleon`, but for many positions at once, returning the `k` closest nucleons for each"""
+        nucleons_list = self.get_nucleons_list()
+        return [[nucleons_list[i] for i in row] for row in self.find_closest_nucleon_indices(positions, filter_type, k).tolist()]
+
+    def find_closest_nucleon(self, position, filter_type=None):
+        return self.get_nucleons_list()[self.find_closest_nucleon_indices(position, filter_type)[0, 0]]
+
+    def _get_force_coords(self):
+        """The centres of the nucleons in the plane, which is the only space the force kernels work in"""
+        self._enforce_init()
+        if self.three_d:
+            raise ValueError("Forces can only be computed for flat nuclei, not for ones with `three_d` set")
+        return self.get_nucleon_centers()[:, :2]
+
+    def get_forces(self, fm_per_unit=None, coulomb_strength=1.0, strong_force_range=forces.STRONG_FORCE_RANGE,
+                   strong_force_shape=(forces.STRONG_FORCE_A, forces.STRONG_FORCE_B, forces.STRONG_FORCE_C)):
+        """Returns the Coulomb and strong forces on each nucleon at their current positions, as two (N, 2) arrays
+        Distances are converted to fm with `fm_per_unit`, by default taking the nucleon separation to be 1 fm
+        """
+        coords = self._get_force_coords()
+        if fm_per_unit is None:
+            fm_per_unit = 1 / self.nucleon_separation
+        return core.get_forces(coords, self.get_nucleon_types(), fm_per_unit, coulomb_strength,
+                               strong_force_range, strong_force_shape)
+
+    def get_binding(self, fm_per_unit=None, **kwargs):
+        """How strongly each nucleon is held in by the net force, negative for the ones being pushed out
+        The keyword arguments are passed to `get_forces`
+        """
+        coords = self._get_force_coords()
+        if fm_per_unit is None:
+            fm_per_unit = 1 / self.nucleon_separation
+        return core.get_binding(coords, self.get_nucleon_types(), fm_per_unit, **kwargs)
+
+
+def _get_nucleon_states(nucleons):
+    """Returns the centres, radii, fill colours and stroke colours of nucleons of any kind, reading compact nuclei in bulk"""
+    centers = np.zeros((len(nucleons), 3))
+    radii = np.zeros(len(nucleons))
+    fills = np.zeros((len(nucleons), 4))
+    strokes = np.zeros((len(nucleons), 4))
+    compact = {}
+    separate = []
+    for i, nucleon in enumerate(nucleons):
+        if isinstance(nucleon, Nucleus.CompactNucleon):
+            nucleus, positions, indices = compact.setdefault(id(nucleon.nucleus), (nucleon.nucleus, [], []))
+            positions.append(i)
+            indices.append(nucleon.index)
+        else:
+            separate.append(i)
+    for nucleus, positions, indices in compact.values():
+        centers[positions], radii[positions], fills[positions], strokes[positions] = nucleus._get_compact_states(indices)
+    if separate:
+        separate_nucleons = [nucleons[i] for i in separate]
+        centers[separate] = np.array([n.get_center() for n in separate_nucleons])
+        radii[separate] = np.array([n.width / 2 for n in separate_nucleons])
+        # Nucleons are filled with a single colour, so the first row of the colours is all there is
+        fills[separate] = np.array([n.fill_rgbas[0] for n in separate_nucleons])
+        strokes[separate] = np.array([n.stroke_rgbas[0] for n in separate_nucleons])
+    return centers, radii, fills, strokes
+
+def _get_scene_mobjects(nucleons):
+    """The mobjects that put the nucleons in a scene: the nucleons themselves, or the nuclei of compact nucleons"""
+    return list(dict.fromkeys(n.nucleus if isinstance(n, Nucleus.CompactNucleon) else n for n in nucleons))
+
+class NucleusTransition(_m.Animation):
+    """Moves many nucleons at once, interpolating the centres, radii and colours of all of them in one vectorised step per frame
+    Used in place of one `ReplacementTransform` per (old, new) pair, like the ones returned by `decay`. At the end, the old
+    nucleons are replaced by the new ones in the scene. Use `lag_ratio` to stagger the nucleons
+    The nucleons of compact nuclei are drawn by a few temporary batches instead, and their nuclei are swapped as a whole:
+    an old compact nucleus leaves the scene when the transition starts, and a new one enters it at the end
+    """
+    def __init__(self, pairs, lag_ratio=0, start_scale=1, end_scale=1, **kwargs):
+        self.nucleons = [old for old, _ in pairs]
+        self.new_nucleons = [new for _, new in pairs]
+
+        self.start_centers, self.start_radii, self.start_fills, self.start_strokes = _get_nucleon_states(self.nucleons)
+        self.end_centers, self.end_radii, self.end_fills, self.end_strokes = _get_nucleon_states(self.new_nucleons)
+        self.start_radii *= start_scale
+        self.end_radii *= end_scale
+        self._color_changes = np.any(self.start_fills != self.end_fills, axis=1) | np.any(self.start_strokes != self.end_strokes, axis=1)
+        self._colors_change = self._color_changes.any()
+
+        if any(isinstance(n, Nucleus.CompactNucleon) for n in self.nucleons):
+            self._batches, self._batch_indices = self._make_batches()
+            mobject = _m.VGroup(*self._batches)
+        else:
+            self._batches = None
+            mobject = _m.VGroup(*self.nucleons)
+        super().__init__(mobject, lag_ratio=lag_ratio, **kwargs)
+
+    @classmethod
+    def grow(cls, nucleons, **kwargs):
+        """Grows the nucleons from their centres, in place of a `DrawBorderThenFill` for each of them"""
+        return cls([(n, n) for n in nucleons], start_scale=0, **kwargs)
+
+    @classmethod
+    def shrink(cls, nucleons, **kwargs):
+        """Shrinks the nucleons into their centres and removes them, in place of an `Uncreate` for each of them"""
+        return cls([(n, n) for n in nucleons], end_scale=0, remover=True, **kwargs)
+
+    def _make_batches(self):
+        """Makes the batches that draw the nucleons during the transition, one per z-index and colour
+        Nucleons that change their colour get a batch each, as they can be at different stages with a `lag_ratio`
+        """
+        z_indices = np.array([n.z_index for n in self.nucleons], dtype=np.int64).reshape(-1)
+        own_batch = np.where(self._color_changes, np.arange(1, len(self.nucleons) + 1), 0)
+        keys = np.column_stack([z_indices, own_batch, self.start_fills, self.start_strokes])
+        _, group_of = np.unique(keys, axis=0, return_inverse=True)
+        group_of = group_of.reshape(-1)
+        order = np.argsort(group_of, kind="stable")
+        batch_indices = np.split(order, np.flatnonzero(np.diff(group_of[order])) + 1) if len(order) else []
+
+        batches = []
+        for indices in batch_indices:
+            batch = _m.VMobject(z_index=int(z_indices[indices[0]]))
+            batch.set_points(_get_circle_points(self.start_centers[indices], self.start_radii[indices]))
+            batch.fill_rgbas = self.start_fills[indices[:1]]
+            batch.stroke_rgbas = self.start_strokes[indices[:1]]
+            batches.append(batch)
+        return batches, batch_indices
+
+    def create_starting_mobject(self):
+        # The starting state is kept in the arrays instead of a copy of every nucleon
+        return _m.Mobject()
+
+    def _setup_scene(self, scene):
+        super()._setup_scene(scene)
+        if self._batches is not None and scene is not None:
+            # The batches draw the old nucleons from now on
+            scene.remove(*_get_scene_mobjects(self.nucleons))
+
+    def _get_sub_alphas(self, alpha):
+        """The progress of each nucleon, vectorised version of `Animation.get_sub_alpha`"""
+        n = len(self.nucleons)
+        full_length = (n - 1) * self.lag_ratio + 1
+        sub_alphas = np.clip(alpha * full_length - np.arange(n) * self.lag_ratio, 0, 1)
+        if self.lag_ratio == 0:
+            return np.full(n, self.rate_func(alpha))
+        return np.array([self.rate_func(a) for a in sub_alphas])
+
+    def interpolate_mobject(self, alpha):
+        if len(self.nucleons) == 0:
+            return
+        a = self._get_sub_alphas(alpha)[:, None]
+        centers = self.start_centers + (self.end_centers - self.start_centers) * a
+        radii = self.start_radii + (self.end_radii - self.start_radii) * a[:, 0]
+        if self._colors_change:
+            fills = self.start_fills + (self.end_fills - self.start_fills) * a
+            strokes = self.start_strokes + (self.end_strokes - self.start_strokes) * a
+
+        if self._batches is not None:
+            for batch, indices in zip(self._batches, self._batch_indices):
+                batch.set_points(_get_circle_points(centers[indices], radii[indices]))
+                if self._color_changes[indices[0]]:
+                    batch.fill_rgbas = fills[indices[:1]]
+                    batch.stroke_rgbas = strokes[indices[:1]]
+            return
+
+        points = centers[:, None, :] + radii[:, None, None] * _unit_circle_points()
+        for nucleon, nucleon_points in zip(self.nucleons, points):
+            nucleon.points = nucleon_points
+        if self._colors_change:
+            for nucleon, fill, stroke in zip(self.nucleons, fills, strokes):
+                nucleon.fill_rgbas = fill[None]
+                nucleon.stroke_rgbas = stroke[None]
+
+    def clean_up_from_scene(self, scene):
+        super().clean_up_from_scene(scene)
+        # The old nucleons can also be in the scene on their own or through their nucleus, not only through the group
+        scene.remove(self.mobject, *_get_scene_mobjects(self.nucleons))
+        if not self.is_remover():
+            # The same nucleon can be both old and new, so add each one once
+            scene.add(*_get_scene_mobjects(self.new_nucleons))
+
+class _CompactTypeChange(_m.Transform):
+    """Animates `set_particle_type` on a nucleon of a compact nucleus, which can not be animated on its own
+    A particle drawn over the nucleon changes into one of the new type, and the nucleon itself is changed at the end
+    """
+    def __init__(self, nucleon, type, **kwargs):
+        self.nucleon = nucleon
+        self.type = type
+        center = nucleon.get_center()
+        size_multiplier = nucleon.radius / Particle._get_drawn_size(nucleon.type)
+        start = Particle(nucleon.type, size_multiplier, z_index=nucleon.z_index).move_to(center)
+        end = Particle(type, size_multiplier, z_index=nucleon.z_index).move_to(center)
+        super().__init__(start, end, remover=True, **kwargs)
+
+    def clean_up_from_scene(self, scene):
+        super().clean_up_from_scene(scene)
+        self.nucleon.set_particle_type(self.type)
+
+class _Emission(_m.Animation):
+    """Calls `emit` when the animation begins, so that the particles it adds to a `ParticleSystem` appear when it is played"""
+    def __init__(self, emit, **kwargs):
+        self.emit = emit
+        # Only a placeholder is animated, the particle system moves its particles with its own updater
+        super().__init__(_m.Mobject(), remover=True, **kwargs)
+
+    def begin(self):
+        super().begin()
+        self.emit()
+
+
+class ParticleSystem(_m.VGroup):
+    """Any number of emitted particles, stored in arrays and drawn by a few batched mobjects
+    All of the particles are moved by one vectorised update per frame, and disappear once they have lived for their lifetime
+    """
+    def __init__(self, size_multiplier, z_index=20, seed=1, **kwargs):
+        super().__init__(**kwargs)
+        self.size_multiplier = size_multiplier
+        self.particle_z_index = z_index
+        self.rng = np.random.default_rng(seed)
+
+        self.types = np.zeros(0, dtype=np.int64)
+        self.positions = np.zeros((0, 3))
+        self.velocities = np.zeros((0, 3))
+        self.ages = np.zeros(0)
+        self.lifetimes = np.zeros(0)
+
+        self._batches = []
+        self._batch_indices = []
+        self.add_updater(lambda system, dt: system.advance(dt))
+
+    def __len__(self):
+        return len(self.types)
+
+    def emit(self, types, positions, velocities, lifetimes=np.inf):
+        """Adds particles, all of the arguments are either arrays with a value for each new particle or a single value"""
+        positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+        count = len(positions)
+        self.types = np.concatenate([self.types, np.broadcast_to(types, count)]).astype(np.int64)
+        self.positions = np.concatenate([self.positions, positions])
+        self.velocities = np.concatenate([self.velocities, np.broadcast_to(velocities, (count, 3))])
+        self.ages = np.concatenate([self.ages, np.zeros(count)])
+        self.lifetimes = np.concatenate([self.lifetimes, np.broadcast_to(lifetimes, count)])
+        self._rebuild()
+        return self
+
+    def advance(self, dt):
+        """Moves all the particles by `dt` seconds, and removes the ones that have lived for their lifetime"""
+        if dt == 0 or len(self) == 0:
+            return self
+        self.positions += self.velocities * dt
+        self.ages += dt
+        alive = self.ages < self.lifetimes
+        if alive.all():
+            # The same particles are drawn by the same mobjects, so only their points need to change
+            radii = self._get_radii()
+            for batch, indices in zip(self._batches, self._batch_indices):
+                batch.set_points(_get_circle_points(self.positions[indices], radii[indices]))
+        else:
+            for name in ("types", "positions", "velocities", "ages", "lifetimes"):
+                setattr(self, name, getattr(self, name)[alive])
+            self._rebuild()
+        return self
+
+    def _get_radii(self):
+        return Particle._get_drawn_sizes(self.types) * self.size_multiplier
+
+    def _rebuild(self):
+        self.remove(*self._batches)
+        z_indices = np.full(len(self), self.particle_z_index)
+        self._batches, self._batch_indices = _make_circle_batches(self.positions, self._get_radii(), self.types, z_indices)
+        self.add(*self._batches)
+
+    def _get_outward_velocities(self, nucleus, centers, speed, spread):
+        """Velocities pointing away from the centre of the nucleus, rotated by a random angle of up to `spread` radians"""
+        directions = centers - nucleus.get_center()
+        angles = np.arctan2(directions[:, 1], directions[:, 0]) + self.rng.uniform(-spread, spread, len(centers))
+        velocities = np.zeros((len(centers), 3))
+        velocities[:, 0] = speed * np.cos(angles)
+        velocities[:, 1] = speed * np.sin(angles)
+        return velocities
+
+    def emit_beta(self, nucleus, positions, is_plus, speed=2, lifetime=np.inf, spread=np.pi / 4):
+        """Beta decays the nucleons closest to each of the `positions` (offsets from the centre of the nucleus, like `coords`),
+        emitting an electron or positron and a neutrino from each of them
+        Returns the indices of the nucleons that decayed
+        """
+        nucleon_type, new_nucleon_type, beta_type = (PROTON, NEUTRON, POSITRON) if is_plus else (NEUTRON, PROTON, ELECTRON)
+        # Each nucleon can only decay once
+        indices = np.unique(nucleus.find_closest_nucleon_indices(positions, nucleon_type)[:, 0])
+        nucleus.set_nucleon_types(indices, new_nucleon_type)
+
+        centers = nucleus.get_nucleon_centers(indices)
+        self.emit(beta_type, centers, self._get_outward_velocities(nucleus, centers, speed, spread), lifetime)
+        self.emit(NEUTRINO, centers, self._get_outward_velocities(nucleus, centers, speed * 1.25, spread), lifetime)
+        return indices
+
+    def emit_gamma(self, nucleus, positions, speed=4, lifetime=np.inf, spread=np.pi / 8):
+        """Emits a gamma ray from the nucleon closest to each of the `positions`, returning the indices of those nucleons"""
+        indices = nucleus.find_closest_nucleon_indices(positions)[:, 0]
+        centers = nucleus.get_nucleon_centers(indices)
+        self.emit(GAMMA, centers, self._get_outward_velocities(nucleus, centers, speed, spread), lifetime)
+        return indices
+
+    def get_surface_positions(self, nucleus, count):
+        """Picks `count` random positions on the surface of the nucleus, to use as emission sites"""
+        radius = np.linalg.norm(nucleus.get_nucleon_coords(), axis=1).max(initial=0) + nucleus.nucleon_separation
+        angles = self.rng.uniform(0, 2 * np.pi, count)
+        return np.column_stack([radius * np.cos(angles), radius * np.sin(angles)])
+
+class ForceArrows(_m.VGroup):
+    """Arrows showing the forces on the nucleons of a nucleus, computed from the nucleus itself
+    The forces are computed again every frame, so the arrows follow the nucleus while it moves, expands or changes
+    `kinds` chooses which of the "coulomb", "strong" and "net" forces are drawn. The arrows of the net force are also
+    a stability indicator: they are coloured `bound_color` for nucleons that are held in and `unbound_color` otherwise
+    Like the forces themselves, the arrows only work for flat nuclei
+    """
+    def __init__(self, nucleus, indices=None, kinds=("coulomb", "strong"), scale=0.2, coulomb_color=_m.YELLOW,
+                 strong_color=_m.GREEN, bound_color=_m.BLUE, unbound_color=_m.RED, z_index=20, force_kwargs=None, **kwargs):
+        super().__init__(**kwargs)
+        self.nucleus = nucleus
+        self.indices = np.arange(len(nucleus.get_nucleons_list())) if indices is None else np.asarray(indices)
+        self.kinds = kinds
+        self.scale_factor = scale
+        self.bound_color = bound_color
+        self.unbound_color = unbound_color
+        self.force_kwargs = force_kwargs or {}
+
+        colors = {"coulomb": coulomb_color, "strong": strong_color, "net": bound_color}
+        self.arrows = {
+            kind: [_m.Arrow(_m.ORIGIN, _m.RIGHT, buff=0, color=colors[kind], z_index=z_index) for _ in self.indices]
+            for kind in kinds
+        }
+        for kind in kinds:
+            self.add(*self.arrows[kind])
+        self.update_arrows()
+        self.add_updater(lambda arrows: arrows.update_arrows())
+
+    def update_arrows(self):
+        coulomb, strong = self.nucleus.get_forces(**self.force_kwargs)
+        net = coulomb + strong
+        by_kind = {"coulomb": coulomb, "strong": strong, "net": net}
+        centers = self.nucleus.get_nucleon_centers(self.indices)
+        for kind in self.kinds:
+            vectors = np.zeros((len(self.indices), 3))
+            vectors[:, :2] = by_kind[kind][self.indices] * self.scale_factor
+            # An arrow can not be moved once it has no length, so keep it very short instead
+            lengths = np.linalg.norm(vectors, axis=1)
+            vectors[lengths < 1e-3] = 1e-3 * _m.RIGHT
+            for arrow, start, vector in zip(self.arrows[kind], centers, vectors):
+                arrow.put_start_and_end_on(start, start + vector)
+
+        if "net" in self.kinds:
+            is_bound = forces.radial_binding(self.nucleus._get_force_coords(), net)[self.indices] >= 0
+            for arrow, bound in zip(self.arrows["net"], is_bound.tolist()):
+                arrow.set_color(self.bound_color if bound else self.unbound_color)
+        return self
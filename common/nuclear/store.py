@@ -0,0 +1,134 @@
+"""A compact, versioned binary format for precomputed nuclei and decays
+
+A file is a small JSON header followed by raw little-endian arrays, each aligned to 64 bytes:
+
+    8 bytes     magic, b"NUCLEUS\\0"
+    4 bytes     format version, uint32
+    8 bytes     header length, uint64
+    header      JSON with the attributes, and the dtype, shape and offset of every array
+    arrays      raw array data
+
+Loading memory-maps the file, so the arrays are read-only views that any number of processes can share without copying.
+`nucleus_to_arrays` and `save_decay` describe nuclei and decays with named arrays in such a file.
+Only depends on NumPy, like `core`.
+"""
+import json
+import struct
+
+import numpy as np
+
+MAGIC = b"NUCLEUS\0"
+FORMAT_VERSION = 1
+_PREAMBLE = struct.Struct("<8sIQ")
+_ALIGNMENT = 64
+
+def _align(offset):
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+def save(path, arrays, attributes=None):
+    """Writes a dict of named arrays, and a dict of JSON serialisable attributes, to `path`"""
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    arrays = {name: array.astype(array.dtype.newbyteorder("<"), copy=False) for name, array in arrays.items()}
+
+    # The offsets are relative to the end of the header, as its length depends on them
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = _align(offset)
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += array.nbytes
+    header = json.dumps({"attributes": attributes or {}, "arrays": layout}, sort_keys=True).encode()
+    data_start = _align(_PREAMBLE.size + len(header))
+
+    with open(path, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(array.tobytes())
+        # Make sure the file covers the last array, even if it is empty
+        f.truncate(data_start + offset)
+
+def load(path):
+    """Memory-maps a file written by `save`, returning the dict of read-only arrays and the dict of attributes"""
+    with open(path, "rb") as f:
+        magic, version, header_length = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a nucleus file")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path} has format version {version}, but only version {FORMAT_VERSION} is supported")
+        header = json.loads(f.read(header_length))
+    data_start = _align(_PREAMBLE.size + header_length)
+
+    arrays = {}
+    buffer = np.memmap(path, dtype=np.uint8, mode="r") if header["arrays"] else None
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        arrays[name] = np.frombuffer(buffer, dtype, count, data_start + spec["offset"]).reshape(spec["shape"])
+    return arrays, header["attributes"]
+
+def nucleus_to_arrays(types, coords, z_indices, layer_offsets, parameters, prefix=""):
+    """Returns the arrays and the attributes that describe a nucleus, with names starting with `prefix`
+    `parameters` are its nucleon separation, particle number difference and nucleon size multiplier
+    """
+    arrays = {
+        prefix + "types": np.asarray(types).astype(np.int8),
+        prefix + "coords": np.asarray(coords, dtype=float),
+        prefix + "z_indices": np.asarray(z_indices).astype(np.int32),
+        prefix + "layer_offsets": np.asarray(layer_offsets, dtype=np.int64),
+    }
+    return arrays, {prefix + "parameters": list(parameters)}
+
+def nucleus_from_arrays(arrays, attributes, prefix=""):
+    """Returns the types, coords, z-indices, layer offsets and parameters of a nucleus written by `nucleus_to_arrays`"""
+    return (arrays[prefix + "types"], arrays[prefix + "coords"], arrays[prefix + "z_indices"], arrays[prefix + "layer_offsets"],
+            attributes[prefix + "parameters"])
+
+_DECAY_NUCLEI = ("parent/", "daughter1/", "daughter2/")
+
+def save_decay(path, parent, daughter1, daughter2, daughter1_nucleon_indices, daughter2_nucleon_indices):
+    """Writes a decay to `path`: the parent and both daughters, each as the output of `nucleus_to_arrays`, and the
+    indices of the nucleons of the parent that go into each daughter
+    """
+    arrays = {"daughter1_nucleon_indices": np.asarray(daughter1_nucleon_indices, dtype=np.int64),
+              "daughter2_nucleon_indices": np.asarray(daughter2_nucleon_indices, dtype=np.int64)}
+    attributes = {}
+    for prefix, (nucleus_arrays, nucleus_attributes) in zip(_DECAY_NUCLEI, (parent, daughter1, daughter2)):
+        arrays.update({prefix + name: array for name, array in nucleus_arrays.items()})
+        attributes.update({prefix + name: value for name, value in nucleus_attributes.items()})
+    save(path, arrays, attributes)
+
+def load_decay(path, types, coords):
+    """Loads a decay written by `save_decay`, which has to have been computed for a parent with the given types and coords
+    Returns the daughters, each as arrays and attributes that `nucleus_from_arrays` takes, and the indices into the parent
+    """
+    arrays, attributes = load(path)
+    types = np.asarray(types)
+    coords = np.asarray(coords, dtype=float)
+    parent_coords = arrays["parent/coords"]
+    if (not np.array_equal(arrays["parent/types"], types) or parent_coords.shape != coords.shape
+            or not np.allclose(parent_coords, coords)):
+        raise ValueError("The decay in the file was computed for a different nucleus")
+
+    daughters = []
+    for prefix in _DECAY_NUCLEI[1:]:
+        daughters.append((
+            {name[len(prefix):]: array for name, array in arrays.items() if name.startswith(prefix)},
+            {name[len(prefix):]: value for name, value in attributes.items() if name.startswith(prefix)},
+        ))
+    daughter1_nucleon_indices = arrays["daughter1_nucleon_indices"]
+    daughter2_nucleon_indices = arrays["daughter2_nucleon_indices"]
+
+    # Every nucleon of the parent has to go into exactly one daughter, which has to have the same types in the same order
+    all_indices = np.concatenate([daughter1_nucleon_indices, daughter2_nucleon_indices])
+    if not np.array_equal(np.sort(all_indices), np.arange(len(types))):
+        raise ValueError("The nucleons of the daughters in the file do not add up to the parent")
+    for (daughter_arrays, _), indices in zip(daughters, (daughter1_nucleon_indices, daughter2_nucleon_indices)):
+        layer_offsets = daughter_arrays["layer_offsets"]
+        if (len(daughter_arrays["coords"]) != len(indices) or len(daughter_arrays["z_indices"]) != len(indices)
+                or layer_offsets[0] != 0 or layer_offsets[-1] != len(indices)):
+            raise ValueError("A daughter in the file does not have as many nucleons as it gets from the parent")
+        if not np.array_equal(daughter_arrays["types"], types[indices]):
+            raise ValueError("The nucleons of a daughter in the file do not have the types they have in the parent")
+    return daughters[0], daughters[1], daughter1_nucleon_indices, daughter2_nucleon_indices
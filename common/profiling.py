@@ -0,0 +1,213 @@
+"""Opt-in profiling of every `play` and `wait` call of a scene
+
+Scenes inherit from `ProfiledScene` instead of `Scene`. Nothing is measured unless the `SCENE_PROFILE_DIR`
+environment variable is set, in which case `<scene name>.json` (a record of every call) and `<scene name>.trace.json`
+(a Chrome trace, which can be opened with Perfetto, speedscope or chrome://tracing as a flame graph) are written there.
+
+When a scene runs with manim's `dry_run` option, it also records a plan: the animations, run times and mobject and
+updater counts of every call, without any timings, so that plans of the same scene can be diffed. `dry_run` on its own
+only stops the video from being written, so the scene also skips its animations, which makes every call a single update
+to its end time, and `skip_frames` stops the renderer from drawing anything: no frames are rasterised.
+`python render.py --plan` writes the plans of all the scenes, and setting `SCENE_PLAN_DIR` writes
+`<scene name>.plan.json` there whenever a scene runs dry.
+"""
+import manim as _m
+import json
+import os
+import time
+from manim.mobject.text import tex_mobject as _tex_mobject
+
+PROFILE_DIR_VARIABLE = "SCENE_PROFILE_DIR"
+PLAN_DIR_VARIABLE = "SCENE_PLAN_DIR"
+# Digits to round the times of a plan to, so that floating point noise does not show up in diffs
+_PLAN_DIGITS = 6
+
+def skip_frames(scene):
+    """Stops the renderer of a scene that skips its animations from drawing any frames
+    Skipping alone still draws the static mobjects and the last frame of every call, as the renderer ignores it for those
+    """
+    update_frame = scene.renderer.update_frame
+    scene.renderer.update_frame = lambda *args, **kwargs: update_frame(*args, **{**kwargs, "ignore_skipping": False})
+
+class ProfiledScene(_m.Scene):
+    """A scene that records the wall time, mobject counts, updater counts, and the time spent in updaters,
+    rendering and LaTeX around each `play` and `wait`
+    """
+    def __init__(self, *args, **kwargs):
+        # Without this, the renderer of a dry run still captures every frame, and only throws them away at the end
+        if _m.config.dry_run:
+            kwargs.setdefault("skip_animations", True)
+        self._original_tex_to_svg_file = None
+        super().__init__(*args, **kwargs)
+        if _m.config.dry_run:
+            skip_frames(self)
+
+    def render(self, *args, **kwargs):
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            # The LaTeX timing patches manim for the whole process, so undo it even if `construct` raised or the scene
+            # is rerun, neither of which calls `tear_down`
+            if self._original_tex_to_svg_file is not None:
+                _tex_mobject.tex_to_svg_file = self._original_tex_to_svg_file
+                self._original_tex_to_svg_file = None
+
+    def setup(self):
+        super().setup()
+        self.profile_dir = os.environ.get(PROFILE_DIR_VARIABLE)
+        self.profile = []
+        self.plan = []
+        self._plan_time = 0
+        self._profile_kind = None
+        if self.profile_dir is None:
+            return
+
+        self._updater_time = 0
+        self._render_time = 0
+        self._latex_time = 0
+        self._scene_start = time.perf_counter()
+        self._last_play_end = self._scene_start
+
+        # Time the frames that get rendered
+        original_render = self.renderer.render
+        def render(*args, **kwargs):
+            start = time.perf_counter()
+            original_render(*args, **kwargs)
+            self._render_time += time.perf_counter() - start
+        self.renderer.render = render
+
+        # Time LaTeX, which happens when Tex and MathTex are created in between the calls
+        self._original_tex_to_svg_file = _tex_mobject.tex_to_svg_file
+        def tex_to_svg_file(*args, **kwargs):
+            start = time.perf_counter()
+            result = self._original_tex_to_svg_file(*args, **kwargs)
+            self._latex_time += time.perf_counter() - start
+            return result
+        _tex_mobject.tex_to_svg_file = tex_to_svg_file
+
+    def update_mobjects(self, dt):
+        if self.profile_dir is None:
+            return super().update_mobjects(dt)
+        start = time.perf_counter()
+        super().update_mobjects(dt)
+        self._updater_time += time.perf_counter() - start
+
+    def _count_mobjects(self):
+        family = self.get_mobject_family_members()
+        updaters = sum(len(m.updaters) for m in family) + len(self.updaters)
+        return len(self.mobjects), len(family), updaters
+
+    def wait(self, *args, **kwargs):
+        self._profile_kind = "wait"
+        super().wait(*args, **kwargs)
+
+    def play(self, *args, **kwargs):
+        if _m.config.dry_run:
+            return self._play_planned(*args, **kwargs)
+        if self.profile_dir is None:
+            self._profile_kind = None
+            return super().play(*args, **kwargs)
+
+        kind = self._profile_kind or "play"
+        self._profile_kind = None
+        start = time.perf_counter()
+        # Anything done by construct since the last call, including LaTeX
+        build_time = start - self._last_play_end
+        latex_time = self._latex_time
+        self._updater_time = 0
+        self._render_time = 0
+        self._latex_time = 0
+        mobjects_before, submobjects_before, updaters_before = self._count_mobjects()
+
+        super().play(*args, **kwargs)
+
+        end = time.perf_counter()
+        mobjects, submobjects, updaters = self._count_mobjects()
+        self.profile.append({
+            "index": len(self.profile),
+            "kind": kind,
+            "animations": [type(a).__name__ for a in args],
+            "start": start - self._scene_start,
+            "wall_time": end - start,
+            "updater_time": self._updater_time,
+            "render_time": self._render_time,
+            "build_time_before": build_time,
+            "latex_time_before": latex_time,
+            "mobjects": max(mobjects_before, mobjects),
+            "submobjects": max(submobjects_before, submobjects),
+            "updaters": max(updaters_before, updaters),
+        })
+        self._last_play_end = end
+
+    def _play_planned(self, *args, **kwargs):
+        kind = self._profile_kind or "play"
+        self._profile_kind = None
+        mobjects_before, submobjects_before, updaters_before = self._count_mobjects()
+
+        super().play(*args, **kwargs)
+
+        mobjects, submobjects, updaters = self._count_mobjects()
+        # `compile_animation_data` has turned the arguments into animations, such as `.animate` into `_MethodAnimation`
+        self.plan.append({
+            "index": len(self.plan),
+            "kind": kind,
+            "animations": [
+                {"type": type(a).__name__, "mobject": type(a.mobject).__name__, "run_time": round(float(a.run_time), _PLAN_DIGITS)}
+                for a in self.animations
+            ],
+            "start": round(self._plan_time, _PLAN_DIGITS),
+            # Durations can be NumPy numbers, which JSON does not take
+            "run_time": round(float(self.duration), _PLAN_DIGITS),
+            "mobjects": max(mobjects_before, mobjects),
+            "submobjects": max(submobjects_before, submobjects),
+            "updaters": max(updaters_before, updaters),
+        })
+        self._plan_time += float(self.duration)
+
+    def tear_down(self):
+        super().tear_down()
+        plan_dir = os.environ.get(PLAN_DIR_VARIABLE)
+        if _m.config.dry_run and plan_dir is not None:
+            os.makedirs(plan_dir, exist_ok=True)
+            self.save_plan(os.path.join(plan_dir, self.__class__.__name__ + ".plan.json"))
+        if self.profile_dir is None:
+            return
+        os.makedirs(self.profile_dir, exist_ok=True)
+        name = self.__class__.__name__
+        self.save_profile(os.path.join(self.profile_dir, name + ".json"))
+        self.save_trace(os.path.join(self.profile_dir, name + ".trace.json"))
+
+    def save_profile(self, path):
+        with open(path, "w") as f:
+            json.dump({"scene": self.__class__.__name__, "calls": self.profile}, f, indent=2)
+
+    def get_plan(self):
+        return {"scene": self.__class__.__name__, "run_time": round(self._plan_time, _PLAN_DIGITS), "calls": self.plan}
+
+    def save_plan(self, path):
+        with open(path, "w") as f:
+            json.dump(self.get_plan(), f, indent=2)
+            f.write("\n")
+
+    def save_trace(self, path):
+        """Writes the profile in the Chrome trace event format
+        Updater and rendering time are summed over the frames of each call, and shown as consecutive children of it
+        """
+        to_us = lambda seconds: seconds * 1e6
+        events = []
+        def add_event(name, start, duration, args=None):
+            events.append({"name": name, "ph": "X", "pid": 0, "tid": 0, "ts": to_us(start), "dur": to_us(duration), "args": args or {}})
+
+        for call in self.profile:
+            start = call["start"]
+            build_start = start - call["build_time_before"]
+            add_event("construct", build_start, call["build_time_before"])
+            add_event("latex", build_start, call["latex_time_before"])
+
+            name = f"{call['kind']} {call['index']}: {', '.join(call['animations'])}"
+            add_event(name, start, call["wall_time"], {key: call[key] for key in ("mobjects", "submobjects", "updaters")})
+            add_event("updaters", start, call["updater_time"])
+            add_event("rendering", start + call["updater_time"], call["render_time"])
+
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
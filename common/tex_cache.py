@@ -0,0 +1,172 @@
+"""Precompiles the LaTeX used by the scenes in parallel, and keeps the parsed glyphs on disk between runs
+
+Manim already keeps the compiled SVG of every tex string in its Tex directory, and the parsed SVG in an in-memory map.
+This module fills the Tex directory using a process pool before rendering starts, and saves the points and colours of
+the parsed glyphs so that a fresh process can load them into manim's map instead of parsing the SVGs again.
+
+The glyphs are saved as plain arrays (no pickles) in a directory per manim version. Manim's map is keyed by Python
+hashes, which change from process to process, so the files keep what the key is made from and it is hashed on load.
+"""
+import manim as _m
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from manim.mobject.svg import svg_mobject as _svg_mobject
+from manim.utils.iterables import hash_obj
+
+from common import nuclear
+
+MATH_ENVIRONMENT = "align*"
+TEXT_ENVIRONMENT = "center"
+
+# Every (tex string, environment, font size) that should be precompiled
+_registered_labels = set()
+# Labels whose glyphs this process has already put into manim's map
+_loaded_labels = set()
+
+def register_label(tex, font_size, environment=MATH_ENVIRONMENT):
+    """Registers a label or heading that a scene is going to use
+    Use `MATH_ENVIRONMENT` for `MathTex` and `TEXT_ENVIRONMENT` for `Tex`
+    """
+    _registered_labels.add((tex, environment, font_size))
+
+def register_particle_labels(font_size):
+    """Registers every label that `ParticleLabel` can produce without an override"""
+    for type in nuclear.PARTICLE_TYPES:
+        tex = nuclear.ParticleLabel._get_label_tex(type)
+        if tex != "":
+            register_label(tex, font_size)
+
+def get_registered_labels():
+    return sorted(_registered_labels)
+
+def _get_cache_dir():
+    # Points parsed by one manim version are not necessarily what another one would produce
+    return os.path.join(_m.config.get_dir("tex_dir"), "geometry", _m.__version__)
+
+def _get_cache_path(label):
+    key = hashlib.sha256(repr(label).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(_get_cache_dir(), key + ".npz")
+
+def _get_seed(mob):
+    """Returns what manim builds the map key of an SVG mobject from, as JSON, or None if it can not be written as JSON
+    The renderer, which is also part of the key, is left out as it is the same for every process of a run
+    """
+    seed = {
+        "class": mob.__class__.__name__,
+        "svg_default": mob.svg_default,
+        "path_string_config": mob.path_string_config,
+        "file_name": str(mob.file_name),
+    }
+    try:
+        return json.dumps(seed)
+    except TypeError:
+        return None
+
+def _get_key(seed):
+    """Rebuilds manim's `SVGMobject.hash_seed` from a seed written by `_get_seed`, and hashes it like manim does"""
+    seed = json.loads(seed)
+    hash_seed = (seed["class"], seed["svg_default"], seed["path_string_config"], Path(seed["file_name"]), _m.config.renderer)
+    return hash_obj(hash_seed)
+
+def _save_entries(path, entries):
+    """Saves the glyphs of the given parsed SVG mobjects
+    Only the points, colours and stroke widths of their submobjects are kept, which is all that manim takes from a cached
+    mobject. Mobjects with nested submobjects are left out, as manim parses them again if they are missing
+    """
+    seeds = []
+    arrays = {}
+    for mob in entries:
+        seed = _get_seed(mob)
+        glyphs = mob.submobjects
+        if seed is None or any(len(glyph.submobjects) > 0 for glyph in glyphs):
+            continue
+        i = len(seeds)
+        seeds.append(seed)
+        for name in ("points", "fill_rgbas", "stroke_rgbas"):
+            values = [getattr(glyph, name) for glyph in glyphs]
+            arrays[f"{name}_{i}"] = np.concatenate(values) if len(values) > 0 else np.zeros((0, 3 if name == "points" else 4))
+            arrays[f"{name}_counts_{i}"] = np.array([len(value) for value in values], dtype=int)
+        arrays[f"stroke_widths_{i}"] = np.array([glyph.stroke_width for glyph in glyphs], dtype=float)
+    arrays["seeds"] = np.array(seeds, dtype=str)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write to a temporary file first so that other workers never see a half written file
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(temp_path, path)
+
+def _load_entries(path):
+    """Returns the glyphs saved by `_save_entries` as manim's map keys and cached mobjects"""
+    entries = {}
+    with np.load(path, allow_pickle=False) as arrays:
+        for i, seed in enumerate(arrays["seeds"]):
+            split = {
+                name: np.split(arrays[f"{name}_{i}"], np.cumsum(arrays[f"{name}_counts_{i}"])[:-1])
+                for name in ("points", "fill_rgbas", "stroke_rgbas")
+            }
+            glyphs = []
+            for points, fill_rgbas, stroke_rgbas, stroke_width in zip(
+                split["points"], split["fill_rgbas"], split["stroke_rgbas"], arrays[f"stroke_widths_{i}"]
+            ):
+                glyph = _m.VMobject()
+                glyph.points = points
+                glyph.fill_rgbas = fill_rgbas
+                glyph.stroke_rgbas = stroke_rgbas
+                glyph.stroke_width = float(stroke_width)
+                glyphs.append(glyph)
+            entries[_get_key(str(seed))] = _m.VMobject().add(*glyphs)
+    return entries
+
+def _build_label(label, media_dir, tex_dir):
+    """Compiles and parses a single label, then saves the glyphs manim cached for it. Runs in a worker process"""
+    _m.config.media_dir = media_dir
+    _m.config.tex_dir = tex_dir
+    tex, environment, font_size = label
+
+    known_hashes = set(_svg_mobject.SVG_HASH_TO_MOB_MAP)
+    if environment == TEXT_ENVIRONMENT:
+        _m.Tex(tex, font_size=font_size)
+    else:
+        _m.MathTex(tex, font_size=font_size, tex_environment=environment)
+    new_entries = [mob for h, mob in _svg_mobject.SVG_HASH_TO_MOB_MAP.items() if h not in known_hashes]
+    _save_entries(_get_cache_path(label), new_entries)
+
+def load_label_cache(labels=None):
+    """Loads the parsed glyphs of the given labels (all registered ones by default) into manim's SVG cache
+    Labels that this process has loaded before are skipped. Returns the labels that were not on disk yet
+    """
+    if labels is None:
+        labels = get_registered_labels()
+    missing = []
+    for label in labels:
+        if label in _loaded_labels:
+            continue
+        path = _get_cache_path(label)
+        if not os.path.exists(path):
+            missing.append(label)
+            continue
+        _svg_mobject.SVG_HASH_TO_MOB_MAP.update(_load_entries(path))
+        _loaded_labels.add(label)
+    return missing
+
+def precompile(processes=None):
+    """Makes sure that every registered label is compiled and parsed, using `processes` worker processes
+    (all CPUs by default), and loads them into manim's SVG cache so that the scene does not have to wait for LaTeX
+    """
+    missing = load_label_cache()
+    if len(missing) == 0:
+        return
+    media_dir = str(_m.config.media_dir)
+    tex_dir = str(_m.config.get_dir("tex_dir"))
+    # Manim only creates the last level of the Tex directory
+    os.makedirs(tex_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        # Consume the results to raise any errors from the workers
+        list(executor.map(_build_label, missing, [media_dir] * len(missing), [tex_dir] * len(missing)))
+    load_label_cache(missing)
@@ -1,4 +1,9 @@
-from functools import reduce
+import itertools
+
+def flatten(array):
+    """Concatenates a list of lists in linear time"""
+    return list(itertools.chain.from_iterable(array))
+
 # From here https://stackoverflow.com/questions/21418764/flatmap-or-bind-in-python-3
 def flatMap(array):
-    return reduce(list.__add__, array)
\ No newline at end of file
+    return flatten(array)
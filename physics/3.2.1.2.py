@@ -2,7 +2,7 @@ import sys
 sys.path.append('../')
 
 from manim import *
-from common import nuclear
+from common import nuclear, tex_cache, graphing, profiling
 from importlib import reload
 import random
 import numpy as np
@@ -15,7 +15,19 @@ NUCLEON_SEPARATION = 1.0
 PARTICLE_LABEL_FONT_SIZE = 30
 HEADING_FONT_SIZE = 170
 
-class TypesOfDecayScene(Scene):
+# Let the LaTeX be compiled in parallel before the scenes start rendering
+tex_cache.register_particle_labels(PARTICLE_LABEL_FONT_SIZE)
+for tex in [r"\beta^+", r"\beta^-", r"\nu_e", r"\bar{\nu_e}", r"\gamma"]:
+    tex_cache.register_label(tex, PARTICLE_LABEL_FONT_SIZE)
+for tex in [r"$\alpha$ decay", r"$\beta^+$ decay", r"$\beta^-$ decay", r"$\gamma$ decay"]:
+    tex_cache.register_label(tex, HEADING_FONT_SIZE, tex_cache.TEXT_ENVIRONMENT)
+for tex in ["Force strength", "Distance/fm"]:
+    tex_cache.register_label(tex, DEFAULT_FONT_SIZE, tex_cache.TEXT_ENVIRONMENT)
+
+# Hash nuclei and particles by their fingerprints in manim's partial movie cache, instead of serialising all of them
+nuclear.install_fingerprint_hashing()
+
+class TypesOfDecayScene(profiling.ProfiledScene):
     def construct(self):
 
         heading = Tex(r"$\alpha$ decay", font_size=HEADING_FONT_SIZE).shift(2.3 * UP)
@@ -37,7 +49,7 @@ class TypesOfDecayScene(Scene):
         daughter2.move_to(nucleus)
         daughter1.shift(4 * RIGHT + 2 * DOWN)
 
-        self.play(*map(lambda p: ReplacementTransform(p[0], p[1]), pairs1 + pairs2))
+        self.play(nuclear.NucleusTransition(pairs1 + pairs2))
 
         self.wait()
 
@@ -56,8 +68,9 @@ class TypesOfDecayScene(Scene):
         ## Gamma decay
         heading_gamma = Tex(r"$\gamma$ decay", font_size=HEADING_FONT_SIZE).move_to(heading)
         self.play(ReplacementTransform(heading, heading_gamma))
-        new_nucleons = nucleus.get_nucleons_list()
-        random.shuffle(new_nucleons)
+        new_nucleons = list(nucleus.get_nucleons_list())
+        # Use a fixed seed, so that the nucleons are shuffled the same way in every render
+        random.Random(1).shuffle(new_nucleons)
         new_nucleus = nuclear.Nucleus().init_from_nucleons(new_nucleons, NUCLEON_SEPARATION, 4, PARTICLE_SIZE_MULTIPLIER, False)
         new_nucleus.move_to(nucleus)
         # Find some point on the edge of the nucleus
@@ -71,8 +84,7 @@ class TypesOfDecayScene(Scene):
         gamma_label.add_updater(lambda x: x.move_to(initial_arrow.point_from_proportion(0.7)).shift(0.3 * UP))
         self.add(initial_arrow, gamma_label)
         # Go from each original nucleon to the shuffled one
-        self.play(*map(lambda n: ReplacementTransform(n[0], n[1]),
-                       zip(new_nucleons, new_nucleus.get_nucleons_list())))
+        self.play(nuclear.NucleusTransition(list(zip(new_nucleons, new_nucleus.get_nucleons_list()))))
         self.wait(1)
         self.play(ReplacementTransform(initial_arrow, final_arrow))
         self.wait(1)
@@ -99,14 +111,16 @@ class TypesOfDecayScene(Scene):
         beta = nuclear.Particle(beta_type, PARTICLE_SIZE_MULTIPLIER)
         beta.move_to(nucleon)
 
-        beta_label1 = nuclear.ParticleLabel(beta, PARTICLE_LABEL_FONT_SIZE)
-        beta_label2 = nuclear.ParticleLabel(beta, PARTICLE_LABEL_FONT_SIZE, f"\\beta^{sign_letter}")
+        # Keep all the labels on their particles with a single updater
+        labels = nuclear.LabelTracker()
+        beta_label1 = nuclear.ParticleLabel(beta, PARTICLE_LABEL_FONT_SIZE, tracker=labels)
+        beta_label2 = nuclear.ParticleLabel(beta, PARTICLE_LABEL_FONT_SIZE, f"\\beta^{sign_letter}", tracker=labels)
 
         neutrino = nuclear.Particle(nuclear.NEUTRINO, PARTICLE_SIZE_MULTIPLIER)
-        neutrino_label = nuclear.ParticleLabel(neutrino, PARTICLE_LABEL_FONT_SIZE, neutrino_label, color=DARK_GRAY)
         neutrino.move_to(nucleon)
+        neutrino_label = nuclear.ParticleLabel(neutrino, PARTICLE_LABEL_FONT_SIZE, neutrino_label, tracker=labels, color=DARK_GRAY)
 
-        self.add(beta, beta_label1, neutrino, neutrino_label)
+        self.add(labels, beta, beta_label1, neutrino, neutrino_label)
         self.play(nucleon.animate.set_particle_type(new_nucleon_type), beta.animate.shift(2 * LEFT + DOWN),
                   neutrino.animate.shift(2.5 * LEFT + UP), run_time=1)
 
@@ -119,8 +133,9 @@ class TypesOfDecayScene(Scene):
         # Clean up
         self.play(Uncreate(beta), Uncreate(beta_label2),
                   Uncreate(neutrino), Uncreate(neutrino_label))  # destroy the beta particle
+        self.remove(labels)
 
-class ForcesHoldingNucleusTogetherScene(Scene):
+class ForcesHoldingNucleusTogetherScene(profiling.ProfiledScene):
     def construct(self):
         ## Prepare the scene
         nucleus = nuclear.Nucleus().init_from_nums(4, 3, NUCLEON_SEPARATION, 5, PARTICLE_SIZE_MULTIPLIER, seed=1)
@@ -180,7 +195,7 @@ class ForcesHoldingNucleusTogetherScene(Scene):
         proton.shift(5 * LEFT)
         new_nucleus.move_to(nucleus)
 
-        self.play(*map(lambda p: ReplacementTransform(p[0], p[1]), pairs1 + pairs2))
+        self.play(nuclear.NucleusTransition(pairs1 + pairs2))
 
         self.wait()
 
@@ -193,7 +208,7 @@ STRONG_FORCE_C = ValueTracker(-5)
 EM_FORCE_A = ValueTracker(0.7)
 EM_FORCE_B = 0.2
 
-class CompareForcesScene(Scene):
+class CompareForcesScene(profiling.ProfiledScene):
 
     def strong_force_calculation(x):
         # Do some shifting and scaling to the input
@@ -202,7 +217,8 @@ class CompareForcesScene(Scene):
 
     def em_force_calculation(x):
         # Do some shifting and scaling to the input
-        x -= EM_FORCE_B
+        # Note: not done in place, as x is the array of samples
+        x = x - EM_FORCE_B
         return EM_FORCE_A.get_value() * x ** -0.8 + 0.3
 
     def construct(self):
@@ -229,14 +245,14 @@ class CompareForcesScene(Scene):
         x_label = ax.get_x_axis_label(
             Tex("Distance/fm").scale(0.65), edge=DOWN, direction=DOWN, buff=0.5
         )
-        strong_force_graph_repulsive = always_redraw(lambda: ax.plot(CompareForcesScene.strong_force_calculation, color=GREEN_B, x_range=[0.3, 0.5, 0.05]))
-        strong_force_graph_attractive = always_redraw(lambda: ax.plot(CompareForcesScene.strong_force_calculation, color=GREEN_B, x_range=[0.5, 3, 0.05]))
-        strong_force_graph_negligible = always_redraw(lambda: ax.plot(CompareForcesScene.strong_force_calculation, color=GREEN_B, x_range=[3, 4, 0.05]))
-
-        # A graph that is invisible that is used for calculations
-        strong_force_graph_invisible = always_redraw(lambda: ax.plot(CompareForcesScene.strong_force_calculation, color=GREEN_B, x_range=[0.3, 4, 0.05]))
+        # The graphs are only recomputed when the force coefficients change
+        strong_force_samples = graphing.SampledFunction(ax, CompareForcesScene.strong_force_calculation, [0.3, 4, 0.05], [STRONG_FORCE_C])
+        strong_force_graph_repulsive = strong_force_samples.get_curve(0.3, 0.5, color=GREEN_B)
+        strong_force_graph_attractive = strong_force_samples.get_curve(0.5, 3, color=GREEN_B)
+        strong_force_graph_negligible = strong_force_samples.get_curve(3, 4, color=GREEN_B)
 
-        em_force_graph = always_redraw(lambda: ax.plot(CompareForcesScene.em_force_calculation, color=YELLOW, x_range=[0.3, 4, 0.05]))
+        em_force_samples = graphing.SampledFunction(ax, CompareForcesScene.em_force_calculation, [0.3, 4, 0.05], [EM_FORCE_A])
+        em_force_graph = em_force_samples.get_curve(color=YELLOW)
 
         distance = ValueTracker(1)
 
@@ -268,8 +284,8 @@ class CompareForcesScene(Scene):
 
         self.play(entire_graph.animate.shift(2 * LEFT))
 
-        line_to_em = always_redraw(lambda: ax.get_vertical_line(ax.input_to_graph_point(distance.get_value(), em_force_graph), color=BLUE, line_config={"dashed_ratio": 0.85}))
-        line_to_strong = always_redraw(lambda: ax.get_vertical_line(ax.input_to_graph_point(distance.get_value(), strong_force_graph_invisible), color=BLUE, line_config={"dashed_ratio": 0.85}))
+        line_to_em = always_redraw(lambda: ax.get_vertical_line(em_force_samples.input_to_point(distance.get_value()), color=BLUE, line_config={"dashed_ratio": 0.85}))
+        line_to_strong = always_redraw(lambda: ax.get_vertical_line(strong_force_samples.input_to_point(distance.get_value()), color=BLUE, line_config={"dashed_ratio": 0.85}))
 
         self.play(*nucleus.create_anims(DrawBorderThenFill), Create(line_to_em), Create(line_to_strong), Write(is_attractive_label))
         self.wait()
@@ -0,0 +1,215 @@
+"""Renders the scenes of all the topic modules in `physics/` in parallel
+
+Every scene (or section of a scene) is rendered in its own process with its own media directory,
+and the finished videos are collected into one output directory.
+
+    python render.py --workers 4 --sections 2 TypesOfDecayScene
+
+With `--plan`, the scenes are only constructed and their timelines are written as JSON plans, which can be diffed:
+
+    python render.py --plan --output-dir plans
+"""
+import argparse
+import glob
+import importlib.util
+import inspect
+import json
+import os
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+SCENE_DIR = os.path.join(ROOT_DIR, "physics")
+
+def _load_module(path):
+    """Imports a topic module from its path, as their names are not valid module names"""
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+    name = "physics_" + os.path.splitext(os.path.basename(path))[0].replace(".", "_")
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def discover_scenes(scene_dir=SCENE_DIR):
+    """Returns (module path, scene name) for every Scene subclass defined in the topic modules"""
+    from manim import Scene
+
+    scenes = []
+    for path in sorted(glob.glob(os.path.join(scene_dir, "*.py"))):
+        module = _load_module(path)
+        for name, obj in inspect.getmembers(module, inspect.isclass):
+            if issubclass(obj, Scene) and obj.__module__ == module.__name__:
+                scenes.append((path, name))
+    return scenes
+
+def _get_scene_class(module_path, scene_name):
+    from common import tex_cache
+
+    # Load the module again for every job, as scenes can change module level state such as ValueTrackers
+    module = _load_module(module_path)
+    # The glyphs of the labels the module registered were parsed before the workers started
+    tex_cache.load_label_cache()
+    return getattr(module, scene_name)
+
+def _use_tex_dir(tex_dir):
+    """Makes a worker use the Tex directory that was precompiled into, instead of one in the media directory of every job"""
+    from manim import config
+
+    config.tex_dir = tex_dir
+
+def _configure(media_dir, dry_run=False, quality="high_quality", animation_range=None):
+    """Sets every part of manim's config that a job uses, as a worker process can run other jobs before this one"""
+    from manim import config
+
+    config.media_dir = media_dir
+    config.dry_run = dry_run
+    config.quality = quality
+    # (0, -1) is manim's default of rendering every animation
+    config.from_animation_number, config.upto_animation_number = animation_range or (0, -1)
+
+def _count_animations(module_path, scene_name, media_dir):
+    """Runs the scene without rasterising or writing anything to find how many play and wait calls it makes"""
+    from common import profiling
+
+    _configure(media_dir, dry_run=True)
+    scene = _get_scene_class(module_path, scene_name)(skip_animations=True)
+    profiling.skip_frames(scene)
+    scene.render()
+    return scene.renderer.num_plays
+
+def _plan(module_path, scene_name, media_dir):
+    """Runs the scene without rasterising or writing anything, and returns its plan"""
+    _configure(media_dir, dry_run=True)
+    # `dry_run` only stops the video from being written. Skipping the animations, and `ProfiledScene` calling
+    # `profiling.skip_frames`, is what stops the frames from being drawn
+    scene = _get_scene_class(module_path, scene_name)(skip_animations=True)
+    scene.render()
+    return scene.get_plan()
+
+def _render(module_path, scene_name, media_dir, quality, animation_range=None):
+    """Renders one scene, or only the animations in `animation_range` (inclusive) of it, and returns the video path"""
+    _configure(media_dir, quality=quality, animation_range=animation_range)
+    scene = _get_scene_class(module_path, scene_name)()
+    scene.render()
+    return str(scene.renderer.file_writer.movie_file_path)
+
+def _split_animations(num_animations, num_sections):
+    """Splits the animation numbers into up to `num_sections` inclusive ranges of similar length"""
+    # A section ending at animation 0 can not be expressed, as manim treats an end of 0 as no end
+    num_sections = max(1, min(num_sections, num_animations // 2))
+    bounds = [round(i * num_animations / num_sections) for i in range(num_sections + 1)]
+    return [(start, end - 1) for start, end in zip(bounds[:-1], bounds[1:])]
+
+def _concatenate(video_paths, output_path):
+    list_path = output_path + ".txt"
+    with open(list_path, "w", encoding="utf-8") as f:
+        for path in video_paths:
+            f.write(f"file 'file:{os.path.abspath(path)}'\n")
+    subprocess.run(["ffmpeg", "-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", list_path, "-c", "copy", output_path], check=True)
+    os.remove(list_path)
+
+def render_all(scenes, output_dir, workers=None, quality="high_quality", sections=1):
+    """Renders the given (module path, scene name) pairs using `workers` processes (all CPUs by default)
+    Scenes with more than one section are split by animation number and concatenated afterwards
+    Returns the paths of the finished videos by scene name
+    """
+    output_dir = os.path.abspath(output_dir)
+    worker_dir = os.path.join(output_dir, "workers")
+    os.makedirs(worker_dir, exist_ok=True)
+
+    tex_dir = os.path.join(output_dir, "Tex")
+    _precompile(scenes, workers, tex_dir)
+
+    # Workers are reused, but every job reloads its module and sets the whole config, so the scenes can not affect each other
+    with ProcessPoolExecutor(max_workers=workers, initializer=_use_tex_dir, initargs=(tex_dir,)) as executor:
+        animation_ranges = {}
+        if sections > 1:
+            counts = {
+                scene: executor.submit(_count_animations, *scene, os.path.join(worker_dir, scene[1] + "_count"))
+                for scene in scenes
+            }
+            animation_ranges = {scene: _split_animations(count.result(), sections) for scene, count in counts.items()}
+
+        jobs = {}
+        for scene in scenes:
+            module_path, scene_name = scene
+            ranges = animation_ranges.get(scene, [None])
+            if len(ranges) == 1:
+                ranges = [None]
+            jobs[scene] = [
+                executor.submit(_render, module_path, scene_name, os.path.join(worker_dir, f"{scene_name}_{i}"), quality, animation_range)
+                for i, animation_range in enumerate(ranges)
+            ]
+
+        videos = {}
+        for (_, scene_name), section_jobs in jobs.items():
+            section_videos = [job.result() for job in section_jobs]
+            output_path = os.path.join(output_dir, scene_name + os.path.splitext(section_videos[0])[1])
+            if len(section_videos) == 1:
+                shutil.copyfile(section_videos[0], output_path)
+            else:
+                _concatenate(section_videos, output_path)
+            videos[scene_name] = output_path
+    return videos
+
+def _precompile(scenes, workers, tex_dir):
+    """Compiles the LaTeX of all the given scenes once into `tex_dir`, instead of in every worker"""
+    from common import tex_cache
+
+    _use_tex_dir(tex_dir)
+    for module_path in sorted({module_path for module_path, _ in scenes}):
+        _load_module(module_path)
+    tex_cache.precompile(workers)
+
+def plan_all(scenes, output_dir, workers=None):
+    """Writes the plan of every given (module path, scene name) pair to `<output_dir>/<scene name>.plan.json`
+    Returns the paths of the plans by scene name
+    """
+    output_dir = os.path.abspath(output_dir)
+    worker_dir = os.path.join(output_dir, "workers")
+    os.makedirs(worker_dir, exist_ok=True)
+    tex_dir = os.path.join(output_dir, "Tex")
+    _precompile(scenes, workers, tex_dir)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_use_tex_dir, initargs=(tex_dir,)) as executor:
+        jobs = {
+            scene_name: executor.submit(_plan, module_path, scene_name, os.path.join(worker_dir, scene_name + "_plan"))
+            for module_path, scene_name in scenes
+        }
+        paths = {}
+        for scene_name, job in jobs.items():
+            paths[scene_name] = os.path.join(output_dir, scene_name + ".plan.json")
+            with open(paths[scene_name], "w") as f:
+                json.dump(job.result(), f, indent=2)
+                f.write("\n")
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scenes", nargs="*", help="names of the scenes to render, all of them by default")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes, the number of CPUs by default")
+    parser.add_argument("--quality", default="high_quality", help="manim quality, such as low_quality or production_quality")
+    parser.add_argument("--sections", type=int, default=1, help="split every scene into this many sections that are rendered in parallel")
+    parser.add_argument("--plan", action="store_true", help="only construct the scenes, and write their timelines as JSON plans")
+    parser.add_argument("--output-dir", default=os.path.join(ROOT_DIR, "media_parallel"))
+    args = parser.parse_args()
+
+    scenes = discover_scenes()
+    if args.scenes:
+        unknown = set(args.scenes) - {name for _, name in scenes}
+        if unknown:
+            parser.error(f"unknown scenes: {', '.join(sorted(unknown))}")
+        scenes = [scene for scene in scenes if scene[1] in args.scenes]
+
+    if args.plan:
+        results = plan_all(scenes, args.output_dir, args.workers)
+    else:
+        results = render_all(scenes, args.output_dir, args.workers, args.quality, args.sections)
+    for scene_name, path in results.items():
+        print(f"{scene_name}: {path}")
+
+if __name__ == "__main__":
+    main()
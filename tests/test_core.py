@@ -0,0 +1,206 @@
+"""Checks the NumPy data model of nuclei against the simple versions it replaced, without importing manim"""
+import itertools
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from common.nuclear import core
+
+def _loop_layout(number_of_particles, nucleon_separation, particle_num_difference):
+    """The layers of the layout as the original while loop built them, outermost first"""
+    particle_nums = []
+    particle_num_in_layer = 1
+    while True:
+        if number_of_particles <= particle_num_in_layer:
+            particle_nums.append(number_of_particles)
+            break
+        number_of_particles -= particle_num_in_layer
+        particle_nums.append(particle_num_in_layer)
+        particle_num_in_layer += particle_num_difference
+
+    layers = []
+    for particle_num in reversed(particle_nums):
+        radius = 0 if particle_num == 1 else nucleon_separation / (2*np.pi) * particle_num
+        angles = np.linspace(0, 2*np.pi, particle_num, endpoint=False)
+        layers.append(np.stack([radius * np.cos(angles), radius * np.sin(angles)], axis=1).reshape(-1, 2))
+    return layers
+
+@pytest.mark.parametrize("particle_num_difference", [0, 1, 2, 5, 6, 13])
+def test_layer_sizes_match_loop(particle_num_difference):
+    for number_of_particles in range(0, 400):
+        layers = _loop_layout(number_of_particles, 1.0, particle_num_difference)
+        expected = [len(layer) for layer in reversed(layers)]
+        assert core._get_layer_sizes(number_of_particles, particle_num_difference).tolist() == expected
+
+@pytest.mark.parametrize("number_of_particles", [0, 1, 2, 7, 50, 237])
+@pytest.mark.parametrize("particle_num_difference", [0, 1, 5])
+def test_layout_matches_loop(number_of_particles, particle_num_difference):
+    positions, layer_offsets = core.layout_nucleus(number_of_particles, 0.7, particle_num_difference)
+    layers = _loop_layout(number_of_particles, 0.7, particle_num_difference)
+    assert layer_offsets.tolist() == np.cumsum([0] + [len(layer) for layer in layers]).tolist()
+    assert np.allclose(positions, np.concatenate(layers))
+    # The layouts are shared through the cache
+    assert not positions.flags.writeable
+
+@pytest.mark.parametrize("number_of_particles", [1, 2, 13, 100, 1000])
+def test_layout_nucleus_3d(number_of_particles):
+    separation = 0.3
+    positions, shell_offsets = core.layout_nucleus_3d(number_of_particles, separation)
+    assert positions.shape == (number_of_particles, 3)
+    assert shell_offsets[0] == 0 and shell_offsets[-1] == number_of_particles
+    assert np.all(np.diff(shell_offsets) > 0)
+    # Shells are `separation` apart, outermost first, and the innermost one is the single particle at the centre
+    radii = np.linalg.norm(positions, axis=1)
+    for shell, (start, end) in enumerate(zip(shell_offsets[:-1], shell_offsets[1:])):
+        assert np.allclose(radii[start:end], separation * (len(shell_offsets) - 2 - shell))
+    # No two particles end up on top of each other
+    if number_of_particles > 1:
+        sq_distances = ((positions[:, None, :] - positions[None, :, :]) ** 2).sum(axis=2)
+        np.fill_diagonal(sq_distances, np.inf)
+        assert np.sqrt(sq_distances.min()) > 0.8 * separation
+    assert not positions.flags.writeable
+
+def _sorted_partition(coords, types, num_protons, num_neutrons, start_position):
+    """The decay partition as the original sort and quota built it"""
+    sq_distances = [(x - start_position[0]) ** 2 + (y - start_position[1]) ** 2 for x, y in coords]
+    quotas = {core.PROTON: num_protons, core.NEUTRON: num_neutrons}
+    daughter1, daughter2 = [], []
+    for i in sorted(range(len(coords)), key=lambda i: sq_distances[i]):
+        if quotas[types[i]] > 0:
+            quotas[types[i]] -= 1
+            daughter1.append(i)
+        else:
+            daughter2.append(i)
+    return sorted(daughter1), sorted(daughter2)
+
+def test_select_closest_matches_stable_sort():
+    rng = np.random.default_rng(5)
+    # Few distinct values, so that there are many ties
+    sq_distances = rng.integers(0, 8, 60).astype(float)
+    for count in range(-1, 62):
+        expected = np.sort(np.argsort(sq_distances, kind="stable")[:max(count, 0)])
+        assert np.array_equal(core.select_closest(sq_distances, count), expected)
+
+# The centre of the nucleus is as far from every nucleon of a layer, which makes ties
+@pytest.mark.parametrize("start_position", [(0, 0), (1.3, -0.4), (40, 40)])
+@pytest.mark.parametrize("quotas", [(2, 2), (0, 5), (20, 25), (40, 40)])
+def test_partition_for_decay_matches_sort(start_position, quotas):
+    coords, _ = core.layout_nucleus(45, 0.5, 5)
+    types = np.random.default_rng(6).permutation([core.PROTON] * 20 + [core.NEUTRON] * 25)
+    daughter1, daughter2 = core.partition_for_decay(coords, types, *quotas, start_position)
+    assert (daughter1.tolist(), daughter2.tolist()) == _sorted_partition(coords.tolist(), types.tolist(), *quotas, start_position)
+
+def _brute_force_neighbours(coords, points, k):
+    sq_distances = ((points[:, None, :] - coords[None, :, :]) ** 2).sum(axis=2)
+    return np.argsort(sq_distances, axis=1, kind="stable")[:, :k], np.sort(sq_distances, axis=1)[:, :k]
+
+@pytest.mark.parametrize("dimensions", [2, 3])
+@pytest.mark.parametrize("k", [1, 4])
+def test_nucleon_grid_matches_brute_force(dimensions, k):
+    rng = np.random.default_rng(3)
+    coords = rng.uniform(-5, 5, size=(300, dimensions))
+    # Some of the query points are far outside the grid
+    points = np.concatenate([rng.uniform(-5, 5, size=(100, dimensions)), rng.uniform(-50, 50, size=(20, dimensions))])
+    grid = core.NucleonGrid(coords, np.arange(len(coords)), 0.5)
+    sq_distances, indices = grid.query(points, k)
+    expected_indices, expected_sq_distances = _brute_force_neighbours(coords, points, k)
+    assert np.array_equal(indices, expected_indices)
+    assert np.allclose(sq_distances, expected_sq_distances)
+
+# A limit of 0 makes every query use the grids
+@pytest.mark.parametrize("linear_scan_limit", [0, core.NucleonIndex.LINEAR_SCAN_LIMIT])
+def test_nucleon_index_filters_by_type(monkeypatch, linear_scan_limit):
+    monkeypatch.setattr(core.NucleonIndex, "LINEAR_SCAN_LIMIT", linear_scan_limit)
+    rng = np.random.default_rng(4)
+    coords = rng.uniform(-5, 5, size=(200, 2))
+    types = rng.integers(0, 2, 200)
+    points = rng.uniform(-5, 5, size=(50, 2))
+    index = core.NucleonIndex(coords, types, 0.5)
+    of_type = np.flatnonzero(types == core.NEUTRON)
+    expected = of_type[_brute_force_neighbours(coords[of_type], points, 3)[0]]
+    assert np.array_equal(index.query(points, core.NEUTRON, 3), expected)
+    with pytest.raises(ValueError):
+        index.query(points, core.ELECTRON)
+
+def test_core_does_not_import_manim():
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(core.__file__))))
+    code = "import sys; from common.nuclear import core; assert 'manim' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], cwd=root, check=True)
+
+def test_unknown_names_do_not_import_manim():
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(core.__file__))))
+    code = ("import sys; from common import nuclear; "
+            "assert not hasattr(nuclear, 'Nucleon') and not hasattr(nuclear, '__path_hooks__'); assert 'manim' not in sys.modules")
+    subprocess.run([sys.executable, "-c", code], cwd=root, check=True)
+
+def test_plan_decay_keeps_the_partition():
+    coords, _ = core.layout_nucleus(60, 0.3, 5)
+    types = np.random.default_rng(6).permutation([core.PROTON] * 28 + [core.NEUTRON] * 32)
+    daughter1, daughter2 = core.partition_for_decay(coords, types, 2, 2, (1, 0))
+    ordered1, ordered2 = core.plan_decay(coords, types, 2, 2, (1, 0), 0.3, 5, minimise_motion=True)
+    assert np.array_equal(np.sort(ordered1), daughter1)
+    assert np.array_equal(np.sort(ordered2), daughter2)
+    assert np.sum(types[daughter1] == core.PROTON) == 2 and np.sum(types[daughter1] == core.NEUTRON) == 2
+
+def test_decay_chain_plan_follows_the_modes():
+    types = np.random.default_rng(7).permutation([core.PROTON] * 92 + [core.NEUTRON] * 146)
+    steps = core.plan_decay_chain(types, np.arange(len(types)), core.URANIUM_238_SERIES, 0.3, 5)
+    assert [step.mode for step in steps] == core.URANIUM_238_SERIES
+    for step in steps:
+        expected = types.copy()
+        if step.converted >= 0:
+            expected[step.converted] = core.PROTON if step.mode == core.BETA_MINUS else core.NEUTRON
+        # Every nucleon of the parent either stays, or leaves with the alpha particle
+        assert np.array_equal(np.sort(np.concatenate([step.sources, step.emitted])), np.arange(len(types)))
+        assert len(step.emitted) == (4 if step.mode == core.ALPHA else 0)
+        assert np.array_equal(step.types, expected[step.sources])
+        types = step.types
+    # Lead-206
+    assert np.count_nonzero(types == core.PROTON) == 82
+    assert np.count_nonzero(types == core.NEUTRON) == 124
+
+def _brute_force_min_cost(old_coords, new_coords):
+    cost = np.linalg.norm(old_coords[:, None, :] - new_coords[None, :, :], axis=2)
+    columns = np.arange(len(new_coords))
+    return min(cost[np.array(sources), columns].sum() for sources in itertools.permutations(range(len(old_coords))))
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("dimensions", [2, 3])
+def test_assign_min_cost_is_optimal(seed, dimensions):
+    rng = np.random.default_rng(seed)
+    n = rng.integers(1, 8)
+    old_coords = rng.normal(size=(n, dimensions))
+    new_coords = rng.normal(size=(n, dimensions))
+    sources = core.assign_min_cost(old_coords, new_coords)
+    assert sorted(sources.tolist()) == list(range(n))
+    cost = np.linalg.norm(old_coords[sources] - new_coords, axis=1).sum()
+    assert cost == pytest.approx(_brute_force_min_cost(old_coords, new_coords))
+
+@pytest.mark.parametrize("dimensions", [2, 3])
+def test_greedy_assignment_is_a_permutation(dimensions):
+    rng = np.random.default_rng(1)
+    old_coords = rng.normal(size=(500, dimensions))
+    # Duplicates and a tight cluster make many proposals go to the same new point
+    new_coords = np.concatenate([rng.normal(size=(400, dimensions)), np.zeros((50, dimensions)), rng.normal(scale=1e-3, size=(50, dimensions))])
+    sources = core.assign_min_cost(old_coords, new_coords, exact_limit=0)
+    assert np.array_equal(np.sort(sources), np.arange(500))
+
+def test_assign_by_type_keeps_types():
+    rng = np.random.default_rng(2)
+    types = rng.integers(0, 2, 40)
+    new_types = rng.permutation(types)
+    sources = core.assign_by_type(rng.normal(size=(40, 2)), types, rng.normal(size=(40, 2)), new_types)
+    assert np.array_equal(np.sort(sources), np.arange(40))
+    assert np.array_equal(types[sources], new_types)
+
+def test_greedy_assignment_tells_depths_apart():
+    rng = np.random.default_rng(3)
+    # Columns of points that only differ in z
+    columns = rng.uniform(-5, 5, size=(60, 2))
+    old_coords = np.concatenate([np.column_stack([columns, np.full(len(columns), z)]) for z in range(5)])
+    new_coords = old_coords[rng.permutation(len(old_coords))]
+    sources = core.assign_min_cost(old_coords, new_coords, exact_limit=0)
+    assert np.array_equal(old_coords[sources], new_coords)
@@ -0,0 +1,60 @@
+"""Checks the vectorised forces against direct sums over every pair"""
+import numpy as np
+import pytest
+
+from common import forces
+from common.nuclear import core
+
+def _pairwise_coulomb(coords, charges):
+    deltas = coords[:, None, :] - coords[None, :, :]
+    sq_distances = (deltas ** 2).sum(axis=2)
+    np.fill_diagonal(sq_distances, np.inf)
+    return charges[:, None] * (charges[None, :, None] * deltas / sq_distances[:, :, None] ** 1.5).sum(axis=1)
+
+def test_exact_coulomb_forces():
+    rng = np.random.default_rng(0)
+    coords = rng.uniform(-3, 3, size=(200, 2))
+    charges = rng.choice([-1, 0, 1], 200).astype(float)
+    assert np.allclose(forces.coulomb_forces(coords, charges), _pairwise_coulomb(coords, charges))
+
+def test_approximate_coulomb_forces():
+    rng = np.random.default_rng(1)
+    coords = rng.uniform(-20, 20, size=(2000, 2))
+    charges = rng.choice([-1, 0, 1], 2000).astype(float)
+    approximate = forces.coulomb_forces(coords, charges, exact_limit=100)
+    exact = _pairwise_coulomb(coords, charges)
+    assert np.linalg.norm(approximate - exact) / np.linalg.norm(exact) < 1e-2
+    # Uncharged particles feel nothing
+    assert np.all(approximate[charges == 0] == 0)
+
+def test_strong_forces_match_pairs_within_range():
+    rng = np.random.default_rng(2)
+    coords = rng.uniform(-5, 5, size=(300, 2))
+    deltas = coords[:, None, :] - coords[None, :, :]
+    distances = np.linalg.norm(deltas, axis=2)
+    in_range = (distances < forces.STRONG_FORCE_RANGE) & (distances > 0)
+    directions = np.divide(deltas, distances[:, :, None], out=np.zeros_like(deltas), where=in_range[:, :, None])
+    expected = (directions * np.where(in_range, forces.strong_force_magnitude(distances), 0)[:, :, None]).sum(axis=1)
+    assert np.allclose(forces.strong_forces(coords), expected)
+
+def test_pairs_within():
+    rng = np.random.default_rng(3)
+    coords = rng.uniform(-5, 5, size=(200, 2))
+    i, j = forces.pairs_within(coords, 1.5)
+    distances = np.linalg.norm(coords[:, None, :] - coords[None, :, :], axis=2)
+    expected = {(a, b) for a, b in zip(*np.nonzero(distances < 1.5)) if a < b}
+    assert set(zip(i.tolist(), j.tolist())) == expected
+    assert len(i) == len(expected)
+
+def test_nucleus_forces_need_2d_coordinates():
+    types = np.array([core.PROTON, core.NEUTRON] * 10)
+    coords, _ = core.layout_nucleus(20, 0.3, 5)
+    coulomb, strong = core.get_forces(coords, types, 1.0)
+    assert coulomb.shape == strong.shape == (20, 2)
+    assert core.get_binding(coords, types, 1.0).shape == (20,)
+    coords_3d, _ = core.layout_nucleus_3d(20, 0.3)
+    for wrong in (coords_3d, coords[:-1], coords.reshape(-1)):
+        with pytest.raises(ValueError):
+            core.get_forces(wrong, types, 1.0)
+        with pytest.raises(ValueError):
+            core.get_binding(wrong, types, 1.0)
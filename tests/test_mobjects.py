@@ -0,0 +1,296 @@
+"""Checks the mobjects of common.nuclear against the simple versions they replaced"""
+import numpy as np
+import pytest
+
+pytest.importorskip("manim")
+import manim as _m
+
+from common import nuclear
+
+def _get_nucleon_state(nucleus):
+    nucleons = nucleus.get_nucleons_list()
+    return (
+        [n.type for n in nucleons],
+        [n.z_index for n in nucleons],
+        np.array([n.get_center() for n in nucleons]),
+        np.array([n.radius for n in nucleons]),
+    )
+
+def test_package_exports_the_public_mobjects():
+    public = {name for name, value in vars(nuclear.mobjects).items()
+              if not name.startswith("_") and callable(value) and getattr(value, "__module__", None) == nuclear.mobjects.__name__}
+    assert public == nuclear._MOBJECT_NAMES
+    for name in public:
+        assert getattr(nuclear, name) is getattr(nuclear.mobjects, name)
+
+def test_particles_from_prototypes_match_built_ones():
+    for type in nuclear.PARTICLE_TYPES:
+        built = nuclear.Particle(type, 0.6).shift(_m.RIGHT)
+        cloned = nuclear.Particle.from_prototype(type, 0.6).shift(_m.RIGHT)
+        assert np.allclose(cloned.points, built.points)
+        assert np.array_equal(cloned.fill_rgbas, built.fill_rgbas)
+        assert np.array_equal(cloned.stroke_rgbas, built.stroke_rgbas)
+    # The prototypes of many size multipliers do not pile up
+    for i in range(200):
+        nuclear.Particle.from_prototype(nuclear.PROTON, 0.5 + i / 1000)
+    assert nuclear.mobjects._get_prototype.cache_info().currsize <= nuclear.mobjects._PROTOTYPE_CACHE_SIZE
+
+def test_type_change_restyles_a_recoloured_particle():
+    particle = nuclear.Particle(nuclear.PROTON, 0.6)
+    expected_fill = particle.fill_rgbas.copy()
+    particle.set_fill(_m.GREEN)
+    # A positron has the same charge as a proton
+    particle.set_particle_type(nuclear.POSITRON)
+    assert np.array_equal(particle.fill_rgbas, expected_fill)
+
+def test_compact_nucleus_matches_regular():
+    regular = nuclear.Nucleus().init_from_nums(30, 40, 0.5, 5, 0.6, seed=3)
+    compact = nuclear.Nucleus(compact=True).init_from_nums(30, 40, 0.5, 5, 0.6, seed=3)
+    regular_state, compact_state = _get_nucleon_state(regular), _get_nucleon_state(compact)
+    assert compact_state[:2] == regular_state[:2]
+    assert np.allclose(compact_state[2], regular_state[2])
+    assert np.allclose(compact_state[3], regular_state[3])
+    # One mobject per (z-index, charge) instead of one per nucleon
+    assert len(compact.submobjects) <= 11 * 2
+
+def test_compact_nucleon_changes_type():
+    nucleus = nuclear.Nucleus(compact=True).init_from_nums(10, 10, 0.5, 5, 0.6, seed=4)
+    types, z_indices, centers, radii = _get_nucleon_state(nucleus)
+    proton = types.index(nuclear.PROTON)
+    nucleus.get_nucleons_list()[proton].set_particle_type(nuclear.NEUTRON)
+    new_types, new_z_indices, new_centers, new_radii = _get_nucleon_state(nucleus)
+    types[proton] = nuclear.NEUTRON
+    assert new_types == types
+    assert new_z_indices == z_indices
+    assert np.allclose(new_centers, centers)
+    assert np.allclose(new_radii, radii)
+
+def _closest_by_scan(nucleus, position, filter_type):
+    nucleons = [n for n in nucleus.get_nucleons_list() if filter_type is None or n.type == filter_type]
+    return min(nucleons, key=lambda n: ((np.asarray(n.coords) - position) ** 2).sum())
+
+@pytest.mark.parametrize("linear_scan_limit", [0, nuclear.NucleonIndex.LINEAR_SCAN_LIMIT])
+@pytest.mark.parametrize("compact, three_d", [(False, False), (True, False), (False, True)])
+def test_find_closest_nucleon_matches_scan(monkeypatch, compact, three_d, linear_scan_limit):
+    monkeypatch.setattr(nuclear.NucleonIndex, "LINEAR_SCAN_LIMIT", linear_scan_limit)
+    nucleus = nuclear.Nucleus(compact, three_d).init_from_nums(40, 50, 0.5, 5, 0.6, seed=7)
+    positions = np.random.default_rng(8).uniform(-4, 4, size=(30, 3 if three_d else 2))
+    for filter_type in (None, nuclear.PROTON, nuclear.NEUTRON):
+        for position in positions:
+            assert nucleus.find_closest_nucleon(position, filter_type) is _closest_by_scan(nucleus, position, filter_type)
+    # The index has to follow type changes
+    nucleus.find_closest_nucleon(positions[0], nuclear.PROTON).set_particle_type(nuclear.NEUTRON)
+    for position in positions:
+        assert nucleus.find_closest_nucleon(position, nuclear.PROTON) is _closest_by_scan(nucleus, position, nuclear.PROTON)
+
+def test_type_changes_only_reset_the_index_of_their_nucleus():
+    nucleus = nuclear.Nucleus().init_from_nums(20, 20, 0.5, 5, 0.6, seed=2)
+    other = nuclear.Nucleus().init_from_nums(20, 20, 0.5, 5, 0.6, seed=3)
+    nucleus.find_closest_nucleon((0, 0), nuclear.PROTON)
+    other_index = other._get_spatial_index()
+    nucleus.find_closest_nucleon((0, 0), nuclear.PROTON).set_particle_type(nuclear.NEUTRON)
+    assert other._get_spatial_index() is other_index
+    # A copy follows the type changes of its own nucleons
+    copy = nucleus.copy()
+    nucleon = copy.find_closest_nucleon((0, 0), nuclear.PROTON)
+    nucleon.set_particle_type(nuclear.NEUTRON)
+    assert copy.find_closest_nucleon((0, 0), nuclear.PROTON) is not nucleon
+    assert nucleus.find_closest_nucleon((0, 0), nuclear.PROTON).type == nuclear.PROTON
+
+def test_label_tracker_moves_labels_with_their_particles():
+    particles = [nuclear.Particle(type, 0.5).shift(i * _m.RIGHT) for i, type in enumerate(nuclear.PARTICLE_TYPES)]
+    # Any mobject works as a label, which keeps LaTeX out of the test
+    labels = [_m.Dot() for _ in particles]
+    tracker = nuclear.LabelTracker()
+    for label, particle in zip(labels, particles):
+        tracker.track(label, particle)
+    assert all(np.allclose(label.get_center(), particle.get_center()) for label, particle in zip(labels, particles))
+
+    particles[1].shift(2 * _m.UP)
+    particles[3].move_to(5 * _m.LEFT)
+    tracker.update()
+    assert all(np.allclose(label.get_center(), particle.get_center()) for label, particle in zip(labels, particles))
+
+    tracker.untrack(labels[0])
+    particles[0].shift(_m.DOWN)
+    particles[2].shift(_m.DOWN)
+    tracker.update()
+    assert np.allclose(labels[0].get_center(), particles[0].get_center() - _m.DOWN)
+    assert np.allclose(labels[2].get_center(), particles[2].get_center())
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_fingerprint_follows_the_state(compact):
+    nucleus = nuclear.Nucleus(compact).init_from_nums(10, 12, 0.5, 5, 0.6, seed=9)
+    fingerprint = nucleus.get_fingerprint()
+    assert nuclear.Nucleus(compact).init_from_nums(10, 12, 0.5, 5, 0.6, seed=9).get_fingerprint() == fingerprint
+
+    nucleus.shift(_m.RIGHT)
+    moved = nucleus.get_fingerprint()
+    assert moved != fingerprint
+    nucleus.get_nucleons_list()[0].set_particle_type(nuclear.NEUTRON if nucleus.get_nucleon_types()[0] == nuclear.PROTON else nuclear.PROTON)
+    assert nucleus.get_fingerprint() not in (fingerprint, moved)
+
+def test_fingerprint_hashing_is_opt_in():
+    from manim.utils import hashing
+
+    # Importing common.nuclear does not change how manim hashes anything
+    assert not getattr(hashing._CustomEncoder.default, "_uses_fingerprints", False)
+    particle = nuclear.Particle(nuclear.ELECTRON, 0.5)
+    nuclear.install_fingerprint_hashing()
+    nuclear.install_fingerprint_hashing()
+    assert hashing._CustomEncoder().default(particle) == particle.get_fingerprint()
+
+def test_nucleus_transition_moves_every_nucleon():
+    nucleus = nuclear.Nucleus().init_from_nums(6, 8, 0.5, 5, 0.6, seed=10)
+    daughter1, daughter2, daughter1_pairs, daughter2_pairs = nucleus.decay(2, 2, (0, 0))
+    daughter1.shift(3 * _m.RIGHT)
+    pairs = daughter1_pairs + daughter2_pairs
+    animation = nuclear.NucleusTransition(pairs)
+    animation.begin()
+    animation.interpolate(1)
+    for old, new in pairs:
+        assert np.allclose(old.get_center(), new.get_center())
+        assert old.width == pytest.approx(new.width)
+
+def test_nucleus_transition_grows_nucleons():
+    nucleons = nuclear.Nucleus().init_from_nums(3, 3, 0.5, 5, 0.6, seed=11).get_nucleons_list()
+    centers = [n.get_center() for n in nucleons]
+    widths = [n.width for n in nucleons]
+    animation = nuclear.NucleusTransition.grow(nucleons)
+    animation.begin()
+    assert all(n.width == pytest.approx(0) for n in nucleons)
+    animation.interpolate(1)
+    assert [n.width for n in nucleons] == pytest.approx(widths)
+    assert np.allclose([n.get_center() for n in nucleons], centers)
+
+def _get_pair_state(pairs):
+    return [(old.get_center().tolist(), new.type, new.z_index, new.get_center().tolist()) for old, new in pairs]
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_nucleus_round_trip(tmp_path, compact):
+    nucleus = nuclear.Nucleus(compact).init_from_nums(15, 20, 0.5, 5, 0.6, seed=12)
+    nucleus.save(tmp_path / "nucleus.bin")
+    loaded = nuclear.Nucleus.load(tmp_path / "nucleus.bin", compact)
+    loaded_state, state = _get_nucleon_state(loaded), _get_nucleon_state(nucleus)
+    assert loaded_state[:2] == state[:2]
+    assert np.allclose(loaded_state[2], state[2])
+    assert np.allclose(loaded_state[3], state[3])
+
+def test_decay_from_file_repeats_decay(tmp_path):
+    nucleus = nuclear.Nucleus().init_from_nums(15, 20, 0.5, 5, 0.6, seed=13)
+    saved = nucleus.save_decay(tmp_path / "decay.bin", 2, 2, (1, 0))
+    loaded = nucleus.decay_from_file(tmp_path / "decay.bin")
+    for saved_pairs, loaded_pairs in zip(saved[2:], loaded[2:]):
+        assert _get_pair_state(loaded_pairs) == _get_pair_state(saved_pairs)
+    with pytest.raises(ValueError):
+        nuclear.Nucleus().init_from_nums(15, 20, 0.5, 5, 0.6, seed=14).decay_from_file(tmp_path / "decay.bin")
+
+def test_decay_chain_builds_the_planned_nuclei():
+    nucleus = nuclear.Nucleus().init_from_nums(12, 14, 0.5, 5, 0.6, seed=15)
+    modes = [nuclear.ALPHA, nuclear.BETA_MINUS, nuclear.GAMMA_DECAY, nuclear.BETA_PLUS]
+    steps = nuclear.core.plan_decay_chain(
+        nucleus.get_nucleon_types(), nucleus.get_nucleon_z_indices(), modes, nucleus.nucleon_separation, nucleus.particle_num_difference, seed=2)
+    daughters = []
+    for daughter, animations in nucleus.decay_chain(modes, seed=2):
+        assert len(animations) > 0
+        if len(daughters) == 0 or daughters[-1] is not daughter:
+            daughters.append(daughter)
+    assert len(daughters) == len(steps)
+    for daughter, step in zip(daughters, steps):
+        assert np.array_equal(daughter.get_nucleon_types(), step.types)
+        assert np.array_equal(daughter.get_nucleon_z_indices(), step.z_indices)
+
+def test_minimise_motion_keeps_the_partition():
+    nucleus = nuclear.Nucleus().init_from_nums(20, 24, 0.5, 5, 0.6, seed=16)
+    by_index = nucleus.decay(2, 2, (1, 0))
+    by_motion = nucleus.decay(2, 2, (1, 0), minimise_motion=True)
+    for index_pairs, motion_pairs in zip(by_index[2:], by_motion[2:]):
+        assert {id(old) for old, _ in motion_pairs} == {id(old) for old, _ in index_pairs}
+        assert all(old.type == new.type for old, new in motion_pairs)
+
+def _run_without_play(animation, scene):
+    animation._setup_scene(scene)
+    animation.begin()
+    animation.interpolate(1)
+    animation.finish()
+    animation.clean_up_from_scene(scene)
+
+def test_nucleus_transition_replaces_the_old_nucleons(tmp_path):
+    with _m.tempconfig({"dry_run": True, "media_dir": str(tmp_path)}):
+        scene = _m.Scene()
+    nucleus = nuclear.Nucleus().init_from_nums(6, 8, 0.5, 5, 0.6, seed=10)
+    # Like `create_anims(DrawBorderThenFill)`, which adds every nucleon on its own
+    scene.add(*nucleus.get_nucleons_list())
+    daughter1, daughter2, daughter1_pairs, daughter2_pairs = nucleus.decay(2, 2, (0, 0))
+    _run_without_play(nuclear.NucleusTransition(daughter1_pairs + daughter2_pairs), scene)
+    family = scene.get_mobject_family_members()
+    assert not any(n in family for n in nucleus.get_nucleons_list())
+    new_nucleons = daughter1.get_nucleons_list() + daughter2.get_nucleons_list()
+    assert all(n in family for n in new_nucleons)
+
+    _run_without_play(nuclear.NucleusTransition.shrink(new_nucleons), scene)
+    assert not any(n in scene.get_mobject_family_members() for n in new_nucleons)
+
+def test_decay_only_emits_gamma_rays_when_played(tmp_path):
+    with _m.tempconfig({"dry_run": True, "media_dir": str(tmp_path)}):
+        scene = _m.Scene()
+    nucleus = nuclear.Nucleus().init_from_nums(6, 8, 0.5, 5, 0.6, seed=10)
+    system = nuclear.ParticleSystem(0.6)
+    scene.add(system)
+    assert len(nucleus.decay(2, 2, (0, 0), particle_system=system)) == 4
+    *result, emission = nucleus.decay(2, 2, (0, 0), particle_system=system, gamma=True)
+    assert len(system) == 0
+    _run_without_play(emission, scene)
+    assert system.types.tolist() == [nuclear.GAMMA]
+    assert set(scene.mobjects) == {system}
+    with pytest.raises(ValueError):
+        nucleus.decay(2, 2, (0, 0), gamma=True)
+
+def test_compact_decay_transition_swaps_the_nuclei(tmp_path):
+    with _m.tempconfig({"dry_run": True, "media_dir": str(tmp_path)}):
+        scene = _m.Scene()
+    nucleus = nuclear.Nucleus(compact=True).init_from_nums(6, 8, 0.5, 5, 0.6, seed=10)
+    scene.add(nucleus)
+    daughter1, daughter2, daughter1_pairs, daughter2_pairs = nucleus.decay(2, 2, (0, 0))
+    daughter1.shift(3 * _m.RIGHT)
+    pairs = daughter1_pairs + daughter2_pairs
+    animation = nuclear.NucleusTransition(pairs)
+    animation._setup_scene(scene)
+    animation.begin()
+    assert nucleus not in scene.mobjects
+    animation.interpolate(1)
+    animation.finish()
+    animation.clean_up_from_scene(scene)
+    # The temporary batches that drew the nucleons are gone as well
+    assert set(scene.mobjects) == {daughter1, daughter2}
+
+def test_compact_nucleon_idioms(tmp_path):
+    with _m.tempconfig({"dry_run": True, "media_dir": str(tmp_path)}):
+        scene = _m.Scene()
+    nucleus = nuclear.Nucleus(compact=True).init_from_nums(6, 8, 0.5, 5, 0.6, seed=10)
+    scene.add(nucleus)
+    nucleon = nucleus.find_closest_nucleon((0, 0), nuclear.NEUTRON)
+    # A handle stands in for its centre
+    assert np.allclose(_m.Dot().move_to(nucleon).get_center(), nucleon.get_center())
+
+    animation = nucleon.animate.set_particle_type(nuclear.PROTON)
+    animation._setup_scene(scene)
+    animation.begin()
+    animation.interpolate(1)
+    animation.finish()
+    animation.clean_up_from_scene(scene)
+    assert nucleon.type == nuclear.PROTON
+    assert nucleus.get_nucleon_types().tolist().count(nuclear.PROTON) == 7
+
+def test_forces_need_a_flat_nucleus():
+    flat = nuclear.Nucleus().init_from_nums(10, 12, 0.5, 5, 0.6, seed=2)
+    coulomb, strong = flat.get_forces()
+    assert coulomb.shape == strong.shape == (22, 2)
+    assert len(nuclear.ForceArrows(flat, kinds=("net",)).arrows["net"]) == 22
+    nucleus_3d = nuclear.Nucleus(three_d=True).init_from_nums(10, 12, 0.5, 5, 0.6, seed=2)
+    with pytest.raises(ValueError):
+        nucleus_3d.get_forces()
+    with pytest.raises(ValueError):
+        nucleus_3d.get_binding()
+    with pytest.raises(ValueError):
+        nuclear.ForceArrows(nucleus_3d)
@@ -0,0 +1,50 @@
+"""Checks that a dry run of a profiled scene records its plan without drawing anything"""
+import json
+
+import pytest
+
+pytest.importorskip("manim")
+import manim as _m
+from manim.mobject.text import tex_mobject as _tex_mobject
+
+from common import profiling
+
+class _PlannedScene(profiling.ProfiledScene):
+    def construct(self):
+        square = _m.Square()
+        self.play(_m.FadeIn(square), run_time=0.5)
+        self.wait(2)
+        self.play(square.animate.shift(_m.RIGHT), _m.Rotate(square))
+
+def test_dry_run_records_plan_without_drawing(tmp_path, monkeypatch):
+    monkeypatch.delenv(profiling.PROFILE_DIR_VARIABLE, raising=False)
+    monkeypatch.setenv(profiling.PLAN_DIR_VARIABLE, str(tmp_path / "plans"))
+    with _m.tempconfig({"dry_run": True, "media_dir": str(tmp_path / "media")}):
+        scene = _PlannedScene()
+
+        def capture_mobjects(*args, **kwargs):
+            raise AssertionError("A dry run drew a frame")
+        scene.renderer.camera.capture_mobjects = capture_mobjects
+        scene.render()
+
+    plan = scene.get_plan()
+    assert [call["kind"] for call in plan["calls"]] == ["play", "wait", "play"]
+    assert [call["run_time"] for call in plan["calls"]] == [0.5, 2, 1]
+    assert [call["start"] for call in plan["calls"]] == [0, 0.5, 2.5]
+    assert plan["run_time"] == 3.5
+    assert [a["type"] for a in plan["calls"][2]["animations"]] == ["_MethodAnimation", "Rotate"]
+    with open(tmp_path / "plans" / "_PlannedScene.plan.json") as f:
+        assert json.load(f) == plan
+
+class _FailingScene(profiling.ProfiledScene):
+    def construct(self):
+        self.wait(0.5)
+        raise RuntimeError("construct failed")
+
+def test_profiling_restores_latex_when_construct_raises(tmp_path, monkeypatch):
+    monkeypatch.setenv(profiling.PROFILE_DIR_VARIABLE, str(tmp_path / "profiles"))
+    original = _tex_mobject.tex_to_svg_file
+    with _m.tempconfig({"dry_run": True, "media_dir": str(tmp_path / "media")}):
+        with pytest.raises(RuntimeError):
+            _FailingScene().render()
+    assert _tex_mobject.tex_to_svg_file is original
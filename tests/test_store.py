@@ -0,0 +1,86 @@
+"""Checks that nuclei and decays survive a round trip through the file format"""
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from common.nuclear import core, store
+
+def _nucleus_arrays(number_of_particles, seed):
+    coords, layer_offsets = core.layout_nucleus(number_of_particles, 0.3, 5)
+    rng = np.random.default_rng(seed)
+    types = rng.integers(0, 2, number_of_particles)
+    z_indices = rng.integers(0, 10, number_of_particles)
+    return types, coords, z_indices, layer_offsets
+
+def test_arrays_round_trip(tmp_path):
+    arrays = {
+        "floats": np.random.default_rng(0).normal(size=(7, 3)),
+        "bytes": np.arange(5, dtype=np.int8),
+        "big_endian": np.arange(4, dtype=">i4"),
+        "empty": np.zeros((0, 2)),
+    }
+    path = tmp_path / "arrays.bin"
+    store.save(path, arrays, {"name": "test", "values": [1, 2.5]})
+    loaded, attributes = store.load(path)
+    assert attributes == {"name": "test", "values": [1, 2.5]}
+    assert set(loaded) == set(arrays)
+    for name, array in arrays.items():
+        assert np.array_equal(loaded[name], array)
+        assert loaded[name].shape == array.shape
+        assert not loaded[name].flags.writeable
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a nucleus file at all")
+    with pytest.raises(ValueError):
+        store.load(path)
+
+def test_nucleus_round_trip(tmp_path):
+    types, coords, z_indices, layer_offsets = _nucleus_arrays(40, 1)
+    path = tmp_path / "nucleus.bin"
+    store.save(path, *store.nucleus_to_arrays(types, coords, z_indices, layer_offsets, [0.3, 5, 1]))
+    loaded = store.nucleus_from_arrays(*store.load(path))
+    for expected, actual in zip((types, coords, z_indices, layer_offsets), loaded[:4]):
+        assert np.array_equal(actual, expected)
+    assert loaded[4] == [0.3, 5, 1]
+
+def _save_decay(path, types, coords):
+    daughter1_indices, daughter2_indices = core.partition_for_decay(coords, types, 2, 2, (1, 0))
+    parent = store.nucleus_to_arrays(types, coords, np.zeros(len(types)), [0, len(types)], [0.3, 5, 1])
+    daughters = []
+    for indices in (daughter1_indices, daughter2_indices):
+        daughter_coords, daughter_layer_offsets = core.layout_nucleus(len(indices), 0.3, 5)
+        daughters.append(store.nucleus_to_arrays(types[indices], daughter_coords, np.zeros(len(indices)), daughter_layer_offsets, [0.3, 5, 1]))
+    store.save_decay(path, parent, daughters[0], daughters[1], daughter1_indices, daughter2_indices)
+    return daughter1_indices, daughter2_indices
+
+def test_decay_round_trip(tmp_path):
+    types = np.array([core.PROTON, core.NEUTRON] * 20)
+    coords = core.layout_nucleus(40, 0.3, 5)[0]
+    path = tmp_path / "decay.bin"
+    daughter1_indices, daughter2_indices = _save_decay(path, types, coords)
+    daughter1, daughter2, loaded1, loaded2 = store.load_decay(path, types, coords)
+    assert np.array_equal(loaded1, daughter1_indices)
+    assert np.array_equal(loaded2, daughter2_indices)
+    assert np.array_equal(store.nucleus_from_arrays(*daughter1)[0], types[daughter1_indices])
+    assert np.array_equal(store.nucleus_from_arrays(*daughter2)[0], types[daughter2_indices])
+
+def test_decay_of_another_nucleus_is_rejected(tmp_path):
+    types = np.array([core.PROTON, core.NEUTRON] * 20)
+    coords = core.layout_nucleus(40, 0.3, 5)[0]
+    path = tmp_path / "decay.bin"
+    _save_decay(path, types, coords)
+    with pytest.raises(ValueError):
+        store.load_decay(path, types[::-1], coords)
+    with pytest.raises(ValueError):
+        store.load_decay(path, types, coords * 2)
+    with pytest.raises(ValueError):
+        store.load_decay(path, types[:-1], coords[:-1])
+
+def test_store_does_not_import_manim():
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(store.__file__))))
+    code = "import sys; from common.nuclear import store; assert 'manim' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], cwd=root, check=True)
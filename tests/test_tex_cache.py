@@ -0,0 +1,36 @@
+"""Checks that parsed glyphs survive a round trip through the glyph cache"""
+import numpy as np
+import pytest
+
+pytest.importorskip("manim")
+import manim as _m
+from manim.mobject.svg import svg_mobject as _svg_mobject
+
+from common import tex_cache
+
+SVG = """<svg xmlns="http://www.w3.org/2000/svg" width="10" height="10" viewBox="0 0 10 10">
+<path d="M 1 1 L 9 1 L 9 9 Z" fill="#ff0000"/>
+<path d="M 1 5 C 2 8 4 8 5 5 Z" fill="#0000ff" stroke="#00ff00" stroke-width="0.5"/>
+</svg>
+"""
+
+def test_glyphs_round_trip(tmp_path):
+    svg_path = tmp_path / "glyphs.svg"
+    svg_path.write_text(SVG)
+    known_hashes = set(_svg_mobject.SVG_HASH_TO_MOB_MAP)
+    _m.SVGMobject(svg_path)
+    entries = {h: mob for h, mob in _svg_mobject.SVG_HASH_TO_MOB_MAP.items() if h not in known_hashes}
+    assert len(entries) == 1
+
+    cache_path = tmp_path / "cache" / "glyphs.npz"
+    tex_cache._save_entries(str(cache_path), list(entries.values()))
+    loaded = tex_cache._load_entries(str(cache_path))
+    # The key is hashed again on load, and has to be the one manim looks the SVG up by
+    assert set(loaded) == set(entries)
+    for key, mob in entries.items():
+        assert len(loaded[key].submobjects) == len(mob.submobjects) == 2
+        for glyph, loaded_glyph in zip(mob.submobjects, loaded[key].submobjects):
+            assert np.array_equal(loaded_glyph.points, glyph.points)
+            assert np.array_equal(loaded_glyph.fill_rgbas, glyph.fill_rgbas)
+            assert np.array_equal(loaded_glyph.stroke_rgbas, glyph.stroke_rgbas)
+            assert loaded_glyph.stroke_width == glyph.stroke_width